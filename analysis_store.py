@@ -0,0 +1,75 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from result_cache import estimate_size
+
+# Default bounds for stored analyses
+DEFAULT_MAX_ENTRIES = 64
+DEFAULT_MAX_BYTES = 1024 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 60 * 60
+
+
+# Thread-safe store of per-session analysis results, looked up by result id, bounded by entry count and
+# estimated size with least recently used eviction, and a time-to-live since last access
+class AnalysisStore:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl_seconds=DEFAULT_TTL_SECONDS, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def _evict_expired(self, now):
+        while self._entries:
+            result_id, (_, last_access, _) = next(iter(self._entries.items()))
+            if now - last_access <= self.ttl_seconds:
+                break
+            self._total_bytes -= self._entries.pop(result_id)[2]
+
+    # Evict least recently used results until the store is within its bounds; the most recent result is kept
+    # even if it alone is larger than the byte budget
+    def _evict_over_budget(self):
+        while len(self._entries) > self.max_entries or \
+                (self._total_bytes > self.max_bytes and len(self._entries) > 1):
+            _, (_, _, size) = self._entries.popitem(last=False)
+            self._total_bytes -= size
+
+    def _put(self, result_id, result, now, size):
+        if result_id in self._entries:
+            self._total_bytes -= self._entries.pop(result_id)[2]
+        self._entries[result_id] = (result, now, size)
+        self._total_bytes += size
+        self._evict_over_budget()
+
+    def add(self, result):
+        result_id = uuid.uuid4().hex
+        size = estimate_size(result)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            self._put(result_id, result, now, size)
+        return result_id
+
+    def get(self, result_id):
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return None
+            self._entries[result_id] = (entry[0], now, entry[2])
+            self._entries.move_to_end(result_id)
+            return entry[0]
+
+    # Replace the result stored under an existing id, returning False if it has expired
+    def replace(self, result_id, result):
+        size = estimate_size(result)
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            if result_id not in self._entries:
+                return False
+            self._put(result_id, result, now, size)
+            return True
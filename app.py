@@ -1,17 +1,13 @@
 from flask import Flask, request, jsonify, render_template_string
 import pandas as pd
 import re
-import math
-import spacy
+from spacy.lang.en.stop_words import STOP_WORDS
+from idf_engine import MATCH_SUBSTRING, calculate_idf_scores
 
 app = Flask(__name__)
 
-# Global variable to store the original order of the rows
-original_order = []
-
-# Load English language model and stop words
-en = spacy.load('en_core_web_sm')
-sw_spacy = en.Defaults.stop_words
+# English stop words (the same list the en_core_web_sm model uses, without loading the model)
+sw_spacy = STOP_WORDS
 
 
 # Function to remove stop words
@@ -77,28 +73,15 @@ def count_word_frequencies_overall(df):
     return {word: count for word, count in word_counts.items() if count > 1}  # Return only repeated words
 
 
-# Function to calculate IDF score
-def calculate_idf(word, documents):
-    # Calculate the IDF (Inverse Document Frequency) score for a word.
-    # IDF = log(total number of documents / number of documents containing the word)
-
-    num_documents_containing_word = sum(1 for document in documents if word in document)
-
-    total_documents = len(documents)
-    if num_documents_containing_word == 0:
-        return 0
-    return math.log(total_documents / num_documents_containing_word)
-
-
 # Function to calculate OSIDF score
-def calculate_osidf_score(df):
+def calculate_osidf_score(df, match=MATCH_SUBSTRING):
     # OSIDF = sum of IDF scores / number of words in a row
     total_documents = len(df)
     word_counts = count_word_frequencies_overall(df)
     osidf_scores = {}
 
-    # Calculate IDF scores for each word
-    idf_scores = {term: calculate_idf(term, df.values.flatten()) for term in word_counts}
+    # Calculate IDF scores for all words at once from a sparse document-term matrix
+    idf_scores = calculate_idf_scores(df.values.flatten(), word_counts, match=match)
 
     # Calculate OSIDF scores
     for text, count in word_counts.items():
@@ -144,10 +127,6 @@ def upload_csv():
         # Read the CSV file
         df = pd.read_csv(file)
 
-        # Store the original order of the rows
-        global original_order
-        original_order = df.index.tolist()
-
         # Count word frequencies and calculate rarity score for each row
         word_counts = count_word_frequencies(df)
 
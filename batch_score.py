@@ -0,0 +1,134 @@
+import argparse
+import sys
+import time
+import numpy as np
+from corpus import InternedCorpus, Vocabulary, add_document_frequencies
+from export import export_term_scores
+from idf_engine import calculate_idf_array, rank_by_idf
+from idf_model import IDFModel
+from ingest import DEFAULT_CHUNK_SIZE, iter_file_text_chunks
+from out_of_core import score_block, score_out_of_core
+from preprocessing import DEFAULT_WORKERS, parallel_lemmatize_documents, preprocess_and_tag_chunk
+from rarity_stats import RarityStatistics
+from score_writers import DOCUMENT_SCORE_COLUMNS, open_score_writer
+
+# Analysis modes: per-document rarity scores (outlier_doc) or per-term rarity scores (outlier_word)
+DOCUMENT = 'document'
+WORD = 'word'
+
+
+# Rows processed, time spent per stage and running statistics of the scores written, reported on stderr
+class Throughput:
+    def __init__(self, quiet=False):
+        self.quiet = quiet
+        self.started_at = time.perf_counter()
+        self.rows = 0
+        self.preprocessing_seconds = 0.0
+        self.statistics = RarityStatistics()
+
+    def add_chunk(self, rows, preprocessing_seconds):
+        self.rows += rows
+        self.preprocessing_seconds += preprocessing_seconds
+        if not self.quiet:
+            elapsed = time.perf_counter() - self.started_at
+            print(f"{self.rows} rows preprocessed ({self.rows / elapsed:.1f} rows/s)", file=sys.stderr)
+
+    def report(self):
+        elapsed = time.perf_counter() - self.started_at
+        rows_per_second = self.rows / elapsed if elapsed else 0.0
+        print(f"Scored {self.rows} rows in {elapsed:.2f}s ({rows_per_second:.1f} rows/s): "
+              f"{self.preprocessing_seconds:.2f}s preprocessing and tagging, "
+              f"{elapsed - self.preprocessing_seconds:.2f}s scoring and writing", file=sys.stderr)
+        summary = self.statistics.summary()
+        print(f"Rarity scores: mean {summary['mean']:.2f}, median {summary['median']:.2f}, "
+              f"standard deviation {summary['std']:.2f}, range {summary['min']:.2f}-{summary['max']:.2f}",
+              file=sys.stderr)
+
+
+# Function to preprocess and tag an input file chunk by chunk, yielding the noun terms of each chunk
+def iter_noun_terms_chunks(source, enable_automatic_correction, chunk_size, workers, throughput):
+    for chunk in iter_file_text_chunks(source, chunk_size):
+        started = time.perf_counter()
+        _, noun_terms_chunk = preprocess_and_tag_chunk(chunk, enable_automatic_correction, workers)
+        throughput.add_chunk(len(chunk), time.perf_counter() - started)
+        yield noun_terms_chunk
+
+
+# Function to write the rarity score and rarest terms of every document of an input file; scored against
+# the file's own document frequencies in two passes, or in one pass against a reference IDF model
+def score_documents_file(source, output_path, enable_automatic_correction=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                         workers=DEFAULT_WORKERS, output_format=None, idf_model=None, throughput=None):
+    throughput = throughput or Throughput()
+    noun_terms_chunks = iter_noun_terms_chunks(source, enable_automatic_correction, chunk_size, workers,
+                                               throughput)
+
+    if idf_model is None:
+        score_out_of_core((noun_terms for chunk in noun_terms_chunks for noun_terms in chunk), output_path,
+                          output_format=output_format, statistics=throughput.statistics)
+        return throughput
+
+    writer = open_score_writer(output_path, DOCUMENT_SCORE_COLUMNS, output_format)
+    try:
+        index = 1
+        for noun_terms_chunk in noun_terms_chunks:
+            corpus = InternedCorpus().add_documents(noun_terms_chunk)
+            block = score_block(corpus.term_ids, corpus.offsets, corpus.vocabulary.terms,
+                                idf_model.idf_for(corpus.vocabulary), index)
+            writer.write(block)
+            throughput.statistics.update(block['Rarity Score'])
+            index += len(corpus)
+    finally:
+        writer.close()
+    return throughput
+
+
+# Function to write the rarity score of every noun and proper noun term of an input file, rarest first
+def score_words_file(source, output_path, enable_automatic_correction=False, chunk_size=DEFAULT_CHUNK_SIZE,
+                     workers=DEFAULT_WORKERS, output_format=None, max_terms=None, throughput=None):
+    throughput = throughput or Throughput()
+    vocabulary = Vocabulary()
+    document_frequencies = np.zeros(0, dtype=np.int64)
+
+    for chunk in iter_file_text_chunks(source, chunk_size):
+        started = time.perf_counter()
+        _, _, noun_terms_chunk = parallel_lemmatize_documents(chunk, enable_automatic_correction, workers=workers)
+        chunk_corpus = InternedCorpus(vocabulary).add_documents(noun_terms_chunk)
+        document_frequencies = add_document_frequencies(document_frequencies, chunk_corpus.document_frequencies())
+        throughput.add_chunk(len(chunk), time.perf_counter() - started)
+
+    inverse_document_frequencies = calculate_idf_array(document_frequencies, throughput.rows)
+    export_term_scores(vocabulary.terms, document_frequencies, inverse_document_frequencies, output_path,
+                       output_format, max_terms)
+    throughput.statistics.update(inverse_document_frequencies[rank_by_idf(inverse_document_frequencies, max_terms)])
+    return throughput
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Score a one-column CSV or Parquet file of documents without '
+                                                 'the web interface')
+    parser.add_argument('source', help='input CSV or Parquet file')
+    parser.add_argument('output', help='output file; .csv, .jsonl, .parquet or .arrow/.feather')
+    parser.add_argument('--mode', choices=[DOCUMENT, WORD], default=DOCUMENT,
+                        help='score each document (default) or each term')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='preprocessing worker processes')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='input rows read at once')
+    parser.add_argument('--autocorrect', action='store_true', help='autocorrect spelling before tagging')
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'parquet', 'arrow'], default=None,
+                        help='output format, if not given by the output file extension')
+    parser.add_argument('--idf-model', help='score documents against a reference model written by idf_model.py')
+    parser.add_argument('--max-terms', type=int, default=None, help='number of rarest terms written in word mode')
+    parser.add_argument('--quiet', action='store_true', help='only report the final throughput')
+    args = parser.parse_args()
+
+    if args.idf_model and args.mode != DOCUMENT:
+        parser.error('--idf-model is only supported in document mode')
+
+    progress = Throughput(quiet=args.quiet)
+    if args.mode == DOCUMENT:
+        model = IDFModel.load(args.idf_model) if args.idf_model else None
+        score_documents_file(args.source, args.output, args.autocorrect, args.chunk_size, args.workers,
+                             args.format, model, progress)
+    else:
+        score_words_file(args.source, args.output, args.autocorrect, args.chunk_size, args.workers,
+                         args.format, args.max_terms, progress)
+    progress.report()
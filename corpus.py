@@ -0,0 +1,210 @@
+import array
+import numpy as np
+from idf_engine import calculate_idf_array
+
+
+# Mapping between terms and dense int32 ids, in order of first occurrence
+class Vocabulary:
+    def __init__(self, terms=()):
+        self.terms = []
+        self._ids = {}
+        for term in terms:
+            self.intern(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def __contains__(self, term):
+        return term in self._ids
+
+    def get(self, term, default=None):
+        return self._ids.get(term, default)
+
+    # Return the id of a term, assigning the next free id to a term seen for the first time
+    def intern(self, term):
+        term_id = self._ids.get(term)
+        if term_id is None:
+            term_id = len(self.terms)
+            self._ids[term] = term_id
+            self.terms.append(term)
+        return term_id
+
+    # Return the ids of a sequence of terms as an int32 array
+    def intern_many(self, terms):
+        return np.array([self.intern(term) for term in terms], dtype=np.int32)
+
+
+# Documents stored as CSR-style arrays: the int32 term ids of every document back to back,
+# and the offset at which each document starts
+class InternedCorpus:
+    def __init__(self, vocabulary=None):
+        self.vocabulary = vocabulary if vocabulary is not None else Vocabulary()
+        self._term_ids = array.array('i')
+        self._offsets = array.array('q', [0])
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def _append(self, terms):
+        intern = self.vocabulary.intern
+        self._term_ids.extend(intern(term) for term in terms)
+        self._offsets.append(len(self._term_ids))
+
+    def add_document(self, terms):
+        self._append(terms)
+
+    def add_documents(self, term_lists):
+        for terms in term_lists:
+            self._append(terms)
+        return self
+
+    # Term ids of every document, back to back, as a view of the stored array; the view must not outlive
+    # the call using it, as the array cannot grow while it is exported
+    @property
+    def term_ids(self):
+        return np.frombuffer(self._term_ids, dtype=np.int32)
+
+    # Start of each document in term_ids, followed by the total number of terms, as a view like term_ids
+    @property
+    def offsets(self):
+        return np.frombuffer(self._offsets, dtype=np.int64)
+
+    @property
+    def lengths(self):
+        return np.diff(self.offsets)
+
+    # Term ids and offsets of the documents from start up to (not including) end, as their own CSR arrays
+    def rows(self, start, end):
+        offsets = np.array(self._offsets[start:end + 1], dtype=np.int64)
+        term_ids = np.array(self._term_ids[int(offsets[0]):int(offsets[-1])], dtype=np.int32)
+        return term_ids, offsets - offsets[0]
+
+    # Start and end of a single document in term_ids
+    def document_span(self, index):
+        return self._offsets[index], self._offsets[index + 1]
+
+    # Distinct terms of each document: their rows, term ids and position of first occurrence,
+    # sorted by row and then by term id
+    def unique_terms(self):
+        return unique_row_terms(self.term_ids, self.offsets)
+
+    # Number of documents containing each term, indexed by term id
+    def document_frequencies(self):
+        _, term_ids, _ = self.unique_terms()
+        return np.bincount(term_ids, minlength=len(self.vocabulary))
+
+    # Average of a per-term value over the terms of each document, 0 for documents without terms
+    def document_means(self, term_values):
+        return row_means(np.asarray(term_values, dtype=np.float64)[self.term_ids], self.offsets)
+
+    # The k distinct terms of each document with the highest value, as CSR offsets and term ids
+    def top_terms(self, term_values, k):
+        return top_k_per_row(self.term_ids, self.offsets, term_values, k)
+
+
+# Interned corpus that keeps its document frequencies up to date as batches of documents are appended,
+# so a new batch costs time proportional to its own size rather than to the whole history
+class IncrementalCorpus(InternedCorpus):
+    def __init__(self, vocabulary=None):
+        super().__init__(vocabulary)
+        self._document_frequencies = np.zeros(0, dtype=np.int64)
+        self._inverse_document_frequencies = None
+
+    def add_document(self, terms):
+        self.add_documents([terms])
+
+    def add_documents(self, term_lists):
+        first_row = len(self)
+        super().add_documents(term_lists)
+
+        # Count only the appended documents and add them to the running document frequencies
+        _, batch_term_ids, _ = unique_row_terms(*self.rows(first_row, len(self)))
+        self._document_frequencies = add_document_frequencies(
+            self._document_frequencies, np.bincount(batch_term_ids, minlength=len(self.vocabulary)))
+
+        # The document count changed, so every IDF value is recalculated on the next read
+        self._inverse_document_frequencies = None
+        return self
+
+    def document_frequencies(self):
+        return add_document_frequencies(np.zeros(len(self.vocabulary), dtype=np.int64), self._document_frequencies)
+
+    # Smoothed IDF of each term id for the documents appended so far, cached until the next append
+    def inverse_document_frequencies(self):
+        if self._inverse_document_frequencies is None:
+            self._inverse_document_frequencies = calculate_idf_array(self.document_frequencies(), len(self))
+        return self._inverse_document_frequencies
+
+
+# Function to find the distinct term ids of each CSR row: their rows, term ids and position of first
+# occurrence, sorted by row and then by term id
+def unique_row_terms(term_ids, offsets):
+    term_ids = np.asarray(term_ids, dtype=np.int64)
+    rows = np.repeat(np.arange(len(offsets) - 1, dtype=np.int64), np.diff(offsets))
+    keys = rows * (int(term_ids.max()) + 1 if len(term_ids) else 1) + term_ids
+    _, first_positions = np.unique(keys, return_index=True)
+    return rows[first_positions], term_ids[first_positions], first_positions
+
+
+# Function to sum the values of each CSR row strictly left to right, vectorized across rows,
+# so results match Python's sum() exactly (np.add.reduceat sums pairwise)
+def row_sums(values, offsets):
+    lengths = np.diff(offsets)
+    sums = np.zeros(len(lengths), dtype=np.float64)
+    if not len(lengths):
+        return sums
+
+    # Process rows from longest to shortest, so the rows still being summed are always a prefix
+    order = np.argsort(-lengths, kind='stable')
+    starts = offsets[:-1][order]
+    descending_lengths = -lengths[order]
+    sorted_sums = np.zeros(len(lengths), dtype=np.float64)
+    for position in range(int(-descending_lengths[0])):
+        active = np.searchsorted(descending_lengths, -position, side='left')
+        sorted_sums[:active] += values[starts[:active] + position]
+
+    sums[order] = sorted_sums
+    return sums
+
+
+# Function to average the values of each CSR row, 0 for empty rows
+def row_means(values, offsets):
+    lengths = np.diff(offsets)
+    sums = row_sums(values, offsets)
+    return np.divide(sums, lengths, out=np.zeros(len(lengths), dtype=np.float64), where=lengths > 0)
+
+
+# Function to select the k distinct terms of each CSR row with the highest value, ties kept in order
+# of first occurrence, returned as CSR offsets and term ids ranked from highest to lowest
+def top_k_per_row(term_ids, offsets, term_values, k):
+    term_values = np.asarray(term_values, dtype=np.float64)
+    rows, unique_ids, first_positions = unique_row_terms(term_ids, offsets)
+
+    # One global sort by row, then descending value, then first occurrence ranks every row at once
+    order = np.lexsort((first_positions, -term_values[unique_ids], rows))
+    rows, unique_ids = rows[order], unique_ids[order]
+    row_starts = np.searchsorted(rows, rows, side='left')
+    keep = np.arange(len(rows)) - row_starts < k
+
+    counts = np.bincount(rows[keep], minlength=len(offsets) - 1)
+    top_offsets = np.concatenate(([0], np.cumsum(counts, dtype=np.int64)))
+    return top_offsets, unique_ids[keep].astype(np.int32)
+
+
+# Function to lay out the values of each CSR row in a fixed number of columns, rows shorter than width padded
+def pad_rows(values, offsets, width, fill_value=0):
+    values = np.asarray(values)
+    lengths = np.diff(offsets)
+    matrix = np.full((len(lengths), width), fill_value, dtype=values.dtype)
+    rows = np.repeat(np.arange(len(lengths)), lengths)
+    columns = np.arange(len(values)) - np.repeat(offsets[:-1], lengths)
+    matrix[rows, columns] = values
+    return matrix
+
+
+# Function to add the document frequencies of one chunk to running totals that grow with the vocabulary
+def add_document_frequencies(totals, frequencies):
+    if len(frequencies) > len(totals):
+        totals = np.concatenate((totals, np.zeros(len(frequencies) - len(totals), dtype=totals.dtype)))
+    totals[:len(frequencies)] += frequencies
+    return totals
@@ -1,10 +1,8 @@
 from flask import Flask, request, render_template_string
 import pandas as pd
-import re
-import math
-import nltk
-from nltk.corpus import stopwords
-from autocorrect import Speller
+from preprocessing import parallel_preprocess_documents
+from corpus import InternedCorpus
+from idf_engine import calculate_idf_array
 import json
 import os
 import tarfile
@@ -12,77 +10,40 @@ import textwrap
 from contextlib import closing
 from urllib.request import urlretrieve
 
-# Download the stopwords corpus if not already downloaded
-nltk.download('stopwords')
-
 app = Flask(__name__)
 
 # Function to calculate the Outlier Score (OS) and Inverse Document Frequency (IDF)
 def calculate_OS_IDF(collection):
-    # Initialize dictionaries to store document frequencies (DF) and inverse document frequencies (IDF)
-    document_frequencies = {}
-    inverse_document_frequencies = {}
-
-    # The documents tokenize into terms.
-    tokenized_documents = [doc.split() for doc in collection]
+    # The documents tokenize into terms, interned as int32 ids
+    corpus = InternedCorpus().add_documents(doc.split() for doc in collection)
+    terms = corpus.vocabulary.terms
 
-    # Calculate the document frequency (DF) for each term
-    for doc in tokenized_documents:
-        unique_terms = set(doc)
-        for term in unique_terms:
-            document_frequencies[term] = document_frequencies.get(term, 0) + 1
+    # Calculate the document frequency (DF) and IDF score for each term (each row counts as one document)
+    inverse_document_frequencies = calculate_idf_array(corpus.document_frequencies(), len(collection))
 
-    # Total number of documents (each row counts as one document)
-    total_documents = len(collection)
+    # Calculate average IDF per document (each row counts as one document)
+    average_term_idf_per_document = [round(avg_idf, 2) for avg_idf in
+                                     corpus.document_means(inverse_document_frequencies).tolist()]
 
-    # Calculate IDF score for each term
-    for term, df in document_frequencies.items():
-        inverse_document_frequencies[term] = round(math.log(total_documents / (1 + df)), 2)
+    # Rank the 10 rarest distinct terms of every document at once
+    top_offsets, top_ids = corpus.top_terms(inverse_document_frequencies, 10)
+    top_term_names = [terms[term_id] for term_id in top_ids.tolist()]
+    top_term_scores = inverse_document_frequencies[top_ids].tolist()
 
-    # Calculate average IDF per document (each row counts as one document)
-    average_term_idf_per_document = []
     max_idf_scores = []
     rarest_terms = []
 
-    for doc in tokenized_documents:
-        doc_idf_values = [inverse_document_frequencies.get(term, 0) for term in doc]
-        if doc_idf_values:
-            avg_idf = round(sum(doc_idf_values) / len(doc), 2)
-            sorted_terms = sorted(set(doc), key=lambda term: -inverse_document_frequencies.get(term, 0))
-            rarest_term = ', '.join(sorted_terms[:10])
-            max_idf = [inverse_document_frequencies.get(term, 0) for term in sorted_terms[:10]]
+    top_offsets = top_offsets.tolist()
+    for start, end in zip(top_offsets[:-1], top_offsets[1:]):
+        if end > start:
+            rarest_terms.append(', '.join(top_term_names[start:end]))
+            max_idf_scores.append(top_term_scores[start:end])
         else:
-            avg_idf = 0
-            max_idf = [0] * 10
-            rarest_term = ""
-
-        average_term_idf_per_document.append(avg_idf)
-        max_idf_scores.append(max_idf)
-        rarest_terms.append(rarest_term)
+            rarest_terms.append("")
+            max_idf_scores.append([0] * 10)
 
     return average_term_idf_per_document, max_idf_scores, rarest_terms
 
-# Function to preprocess each document
-def preprocess_document(doc):
-    doc = re.sub(r'\[\*\*.*?\*\*\]', ' ', doc)
-    doc = re.sub(r'\b\d+\b', ' ', doc)
-    doc = re.sub(r'[^a-zA-Z0-9\s]', ' ', doc)
-    doc = re.sub(r'\s+', ' ', doc)
-    doc = doc.lower()
-
-    stop_words = set(stopwords.words('english'))
-    tokens = doc.split()
-    filtered_tokens = [word for word in tokens if word not in stop_words]
-    doc = ' '.join(filtered_tokens)
-
-    return doc.strip()
-
-# Function to correct spelling using autocorrect library
-def autocorrect_spelling(doc):
-
-    spell = Speller(fast=True)
-    return spell(doc)
-
 
 @app.route('/upload', methods=['POST'])
 def upload_csv():
@@ -101,12 +62,8 @@ def upload_csv():
 
         enable_automatic_correction = request.form.get('enable_automatic_correction') == '1'
 
-        df = df.apply(lambda x: x.map(preprocess_document))
-
-        preprocessed_documents = df.values.flatten()
-
-        if enable_automatic_correction:
-            preprocessed_documents = [autocorrect_spelling(doc) for doc in preprocessed_documents]
+        # Preprocess and optionally autocorrect, across worker processes when MEDINYM_WORKERS > 1
+        preprocessed_documents = parallel_preprocess_documents(df.iloc[:, 0], enable_automatic_correction)
 
         average_idf_scores, max_idf_scores, rarest_terms = calculate_OS_IDF(preprocessed_documents)
 
@@ -0,0 +1,48 @@
+import numpy as np
+from idf_engine import rank_by_idf
+from out_of_core import score_block
+from score_writers import DOCUMENT_SCORE_COLUMNS, TERM_SCORE_COLUMNS, open_score_writer
+
+# Rows written per block, i.e. per Parquet row group or Arrow record batch
+DEFAULT_EXPORT_BLOCK_SIZE = 50000
+
+
+# Function to write the rarity score, rarest terms and their scores of every document of an interned corpus,
+# a block of rows at a time so memory stays bounded by the block size; total_documents limits the export
+# to the documents present when it started
+def export_document_scores(corpus, inverse_document_frequencies, output_path, output_format=None,
+                           block_size=DEFAULT_EXPORT_BLOCK_SIZE, total_documents=None):
+    if total_documents is None:
+        total_documents = len(corpus)
+
+    writer = open_score_writer(output_path, DOCUMENT_SCORE_COLUMNS, output_format)
+    try:
+        for start in range(0, total_documents, block_size):
+            end = min(start + block_size, total_documents)
+            term_ids, offsets = corpus.rows(start, end)
+            writer.write(score_block(term_ids, offsets, corpus.vocabulary.terms, inverse_document_frequencies,
+                                     start + 1))
+    finally:
+        writer.close()
+    return total_documents
+
+
+# Function to write the document frequency and IDF of every term, rarest first, a block of rows at a time
+def export_term_scores(terms, document_frequencies, inverse_document_frequencies, output_path, output_format=None,
+                       max_terms=None, block_size=DEFAULT_EXPORT_BLOCK_SIZE):
+    inverse_document_frequencies = np.asarray(inverse_document_frequencies, dtype=np.float64)
+    document_frequencies = np.asarray(document_frequencies, dtype=np.int64)
+    ranked_ids = rank_by_idf(inverse_document_frequencies, max_terms)
+
+    writer = open_score_writer(output_path, TERM_SCORE_COLUMNS, output_format)
+    try:
+        for start in range(0, len(ranked_ids), block_size):
+            block_ids = ranked_ids[start:start + block_size]
+            writer.write({
+                'Term': [terms[term_id] for term_id in block_ids.tolist()],
+                'Document Frequency': document_frequencies[block_ids].tolist(),
+                'Term Rarity Score': inverse_document_frequencies[block_ids].tolist(),
+            })
+    finally:
+        writer.close()
+    return len(ranked_ids)
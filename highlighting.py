@@ -0,0 +1,60 @@
+from html import escape
+import numpy as np
+
+# Transparency of the rarest term's highlight and the step down for each rank after it
+DEFAULT_MAX_ALPHA = 0.8
+DEFAULT_ALPHA_GAP = 0.05
+
+# Per-row budget: highlighted spans emitted and characters of text scanned for them, so every row
+# costs a bounded amount of work however long the document is
+DEFAULT_MAX_SPANS = 64
+DEFAULT_MAX_CHARS = 20000
+
+
+# Function to give each score a red highlight whose transparency falls with its rank, computed in one sort;
+# equal scores share a rank (the number of strictly higher scores), as in the original gradient
+def gradient_colors(scores, max_alpha=DEFAULT_MAX_ALPHA, alpha_gap=DEFAULT_ALPHA_GAP):
+    scores = np.asarray(scores, dtype=np.float64)
+    ranks = len(scores) - np.searchsorted(np.sort(scores), scores, side='right')
+    alphas = np.clip(max_alpha - ranks * alpha_gap, 0, None)
+    return [f'rgba(255, 0, 0, {round(alpha, 2)})' for alpha in alphas.tolist()]
+
+
+# Function to find the highlighted spans of one document from its precomputed term ids and character offsets:
+# every occurrence of one of its top terms, as (start, end, top term position) in text order
+def highlight_spans(term_ids, char_offsets, top_term_ids, terms, max_spans=DEFAULT_MAX_SPANS,
+                    max_chars=DEFAULT_MAX_CHARS):
+    term_ids = np.asarray(term_ids)
+    char_offsets = np.asarray(char_offsets)
+    top_term_ids = np.asarray(top_term_ids)
+    if not len(term_ids) or not len(top_term_ids):
+        return []
+
+    # Map each occurrence to the position of its term in the top terms, without a per-token lookup
+    order = np.argsort(top_term_ids)
+    sorted_top_ids = top_term_ids[order]
+    positions = np.minimum(np.searchsorted(sorted_top_ids, term_ids), len(sorted_top_ids) - 1)
+    matched = (sorted_top_ids[positions] == term_ids) & (char_offsets < max_chars)
+    matched_indices = np.flatnonzero(matched)[:max_spans]
+
+    starts = char_offsets[matched_indices].tolist()
+    matched_term_ids = term_ids[matched_indices].tolist()
+    ranks = order[positions[matched_indices]].tolist()
+    return [(start, start + len(terms[term_id]), rank)
+            for start, term_id, rank in zip(starts, matched_term_ids, ranks)]
+
+
+# Function to render a document as escaped HTML with its spans wrapped in highlight elements; each span
+# carries its rank so the page can show only the top few without re-rendering
+def render_highlighted_text(text, spans, colors):
+    parts = []
+    position = 0
+    for start, end, rank in spans:
+        if start < position:
+            continue
+        parts.append(escape(text[position:start]))
+        parts.append(f'<span class="rare-term" data-rank="{rank}" data-color="{colors[rank]}" '
+                     f'style="background-color: {colors[rank]};">{escape(text[start:end])}</span>')
+        position = end
+    parts.append(escape(text[position:]))
+    return ''.join(parts)
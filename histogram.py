@@ -0,0 +1,169 @@
+import io
+import json
+from html import escape
+import numpy as np
+
+# Size of the drawn histogram, in pixels for the page and in inches at 100 dpi for the PNG
+HISTOGRAM_WIDTH = 640
+HISTOGRAM_HEIGHT = 480
+
+
+# Function to summarize streaming rarity statistics as a JSON-ready histogram: fixed-width bin counts and edges,
+# mean, median and standard deviation, plus the titles and the headroom above the tallest bin used when drawing it
+def score_histogram(statistics, title, x_label, half_max_line=False, y_padding=5):
+    counts, edges = statistics.histogram()
+    return {
+        'title': title,
+        'x_label': x_label,
+        'y_label': 'Frequency',
+        'half_max_line': half_max_line,
+        'y_padding': y_padding,
+        'counts': counts,
+        'edges': edges,
+        'mean': statistics.mean,
+        'median': statistics.median,
+        'std': statistics.std,
+    }
+
+
+# Function to render a histogram as a PNG image with matplotlib, imported only when an image is asked for
+def render_histogram_png(histogram):
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(HISTOGRAM_WIDTH / 100, HISTOGRAM_HEIGHT / 100), dpi=100)
+    ax = fig.subplots()
+    counts, edges = histogram['counts'], histogram['edges']
+    if counts:
+        mean_score, std_dev_score = histogram['mean'], histogram['std']
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge', color='green', alpha=0.7, edgecolor='black')
+
+        # Plot mean, median, and standard deviation lines
+        ax.axvline(mean_score, color='blue', linestyle='-', linewidth=2, label=f'Mean: {mean_score:.2f}')
+        if histogram['half_max_line']:
+            ax.axhline(y=max(counts) / 2, color='blue', linestyle='-', linewidth=2)
+        ax.axvline(histogram['median'], color='orange', linestyle='--', linewidth=2,
+                   label=f"Median: {histogram['median']:.2f}")
+        ax.axvline(mean_score + std_dev_score, color='yellow', linestyle='--', linewidth=2,
+                   label=f'Standard Deviation: {std_dev_score:.2f}')
+        ax.axvline(mean_score - std_dev_score, color='yellow', linestyle='--', linewidth=2)
+
+        # Set axis limits to ensure the mean lines are visible
+        ax.set_xlim([edges[0] - 1, edges[-1] + 1])
+        ax.set_ylim([0, max(counts) + histogram['y_padding']])
+        ax.legend()
+
+    ax.set_title(histogram['title'])
+    ax.set_xlabel(histogram['x_label'])
+    ax.set_ylabel(histogram['y_label'])
+
+    buf = io.BytesIO()
+    fig.savefig(buf, format='png')
+    return buf.getvalue()
+
+
+# Function to give a histogram's PNG image, rendered on first request and kept with the analysis result
+def cached_histogram_png(result):
+    if 'histogram_png' not in result:
+        result['histogram_png'] = render_histogram_png(result['histogram'])
+    return result['histogram_png']
+
+
+# Script drawing every histogram canvas of a page from its JSON bins and statistics
+HISTOGRAM_SCRIPT = """
+<script>
+function drawHistogram(canvas) {
+    const data = JSON.parse(canvas.getAttribute('data-histogram'));
+    const ctx = canvas.getContext('2d');
+    const margin = {left: 60, right: 20, top: 40, bottom: 50};
+    const plotWidth = canvas.width - margin.left - margin.right;
+    const plotHeight = canvas.height - margin.top - margin.bottom;
+
+    ctx.fillStyle = 'white';
+    ctx.fillRect(0, 0, canvas.width, canvas.height);
+    ctx.fillStyle = 'black';
+    ctx.font = '16px Arial';
+    ctx.textAlign = 'center';
+    ctx.fillText(data.title, canvas.width / 2, 25);
+    ctx.font = '12px Arial';
+    ctx.fillText(data.x_label, margin.left + plotWidth / 2, canvas.height - 10);
+    ctx.save();
+    ctx.translate(15, margin.top + plotHeight / 2);
+    ctx.rotate(-Math.PI / 2);
+    ctx.fillText(data.y_label, 0, 0);
+    ctx.restore();
+    ctx.strokeRect(margin.left, margin.top, plotWidth, plotHeight);
+    if (!data.counts.length) return;
+
+    // Same axis limits as the PNG: one unit either side of the scores, y_padding counts above the tallest bin
+    const xMin = data.edges[0] - 1;
+    const xMax = data.edges[data.edges.length - 1] + 1;
+    const yMax = Math.max(...data.counts) + data.y_padding;
+    const x = value => margin.left + (value - xMin) / (xMax - xMin) * plotWidth;
+    const y = count => margin.top + plotHeight - count / yMax * plotHeight;
+
+    ctx.textAlign = 'center';
+    for (let i = 0; i <= 4; i++) {
+        const value = xMin + (xMax - xMin) * i / 4;
+        ctx.fillText(value.toFixed(2), x(value), margin.top + plotHeight + 18);
+    }
+    ctx.textAlign = 'right';
+    for (let i = 0; i <= 4; i++) {
+        const count = Math.round(yMax * i / 4);
+        ctx.fillText(count, margin.left - 6, y(count) + 4);
+    }
+
+    data.counts.forEach((count, i) => {
+        const left = x(data.edges[i]);
+        const width = x(data.edges[i + 1]) - left;
+        ctx.fillStyle = 'rgba(0, 128, 0, 0.7)';
+        ctx.fillRect(left, y(count), width, y(0) - y(count));
+        ctx.strokeStyle = 'black';
+        ctx.strokeRect(left, y(count), width, y(0) - y(count));
+    });
+
+    function line(x0, y0, x1, y1, color, dash) {
+        ctx.beginPath();
+        ctx.setLineDash(dash);
+        ctx.strokeStyle = color;
+        ctx.lineWidth = 2;
+        ctx.moveTo(x0, y0);
+        ctx.lineTo(x1, y1);
+        ctx.stroke();
+        ctx.setLineDash([]);
+        ctx.lineWidth = 1;
+    }
+    const top = margin.top;
+    const bottom = margin.top + plotHeight;
+    line(x(data.mean), top, x(data.mean), bottom, 'blue', []);
+    if (data.half_max_line) {
+        const half = y(Math.max(...data.counts) / 2);
+        line(margin.left, half, margin.left + plotWidth, half, 'blue', []);
+    }
+    line(x(data.median), top, x(data.median), bottom, 'orange', [6, 4]);
+    line(x(data.mean + data.std), top, x(data.mean + data.std), bottom, 'gold', [6, 4]);
+    line(x(data.mean - data.std), top, x(data.mean - data.std), bottom, 'gold', [6, 4]);
+
+    const legend = [['blue', 'Mean: ' + data.mean.toFixed(2)], ['orange', 'Median: ' + data.median.toFixed(2)],
+                    ['gold', 'Standard Deviation: ' + data.std.toFixed(2)]];
+    ctx.textAlign = 'left';
+    legend.forEach(([color, label], i) => {
+        const legendY = top + 18 + i * 18;
+        line(margin.left + plotWidth - 200, legendY - 4, margin.left + plotWidth - 175, legendY - 4, color, []);
+        ctx.fillStyle = 'black';
+        ctx.fillText(label, margin.left + plotWidth - 170, legendY);
+    });
+}
+document.querySelectorAll('canvas.rarity-histogram').forEach(drawHistogram);
+</script>
+"""
+
+
+# Function to render a histogram as a canvas drawn in the browser from its JSON bins,
+# with a link to the PNG image rendered on demand
+def render_histogram_html(histogram, png_url):
+    data = escape(json.dumps(histogram), quote=True)
+    return (f'<div style="text-align: center;">'
+            f'<canvas class="rarity-histogram" width="{HISTOGRAM_WIDTH}" height="{HISTOGRAM_HEIGHT}" '
+            f'data-histogram="{data}" aria-label="{escape(histogram["title"])} Histogram"></canvas>'
+            f'<div><a href="{escape(png_url)}">Download as PNG</a></div></div>'
+            + HISTOGRAM_SCRIPT)
@@ -0,0 +1,102 @@
+import math
+import re
+import numpy as np
+from scipy import sparse
+
+# Term matching modes: whole lowercase words, or case-sensitive substrings of the raw text
+MATCH_WORD = 'word'
+MATCH_SUBSTRING = 'substring'
+
+WORD_PATTERN = re.compile(r'\w+')
+
+
+# Function to find the vocabulary terms contained in a single word token; a long token has more substrings
+# to look up than there are terms, so the vocabulary is scanned for it instead
+def substring_term_ids(token, vocabulary, max_term_length):
+    if len(token) * min(len(token), max_term_length) > len(vocabulary):
+        return {term_id for term, term_id in vocabulary.items() if term and term in token}
+
+    term_ids = set()
+    for start in range(len(token)):
+        for end in range(start + 1, min(len(token), start + max_term_length) + 1):
+            term_id = vocabulary.get(token[start:end])
+            if term_id is not None:
+                term_ids.add(term_id)
+    return term_ids
+
+
+# Function to build a binary sparse document-term matrix in one pass over the documents
+def build_document_term_matrix(documents, vocabulary, match=MATCH_SUBSTRING):
+    if match not in (MATCH_WORD, MATCH_SUBSTRING):
+        raise ValueError(f"Unknown match mode: {match}")
+
+    # A term made of word characters can only occur inside a run of word characters,
+    # so substring matches are resolved once per distinct token and cached
+    max_term_length = max((len(term) for term in vocabulary), default=0)
+    token_cache = {}
+
+    indptr = [0]
+    indices = []
+    for document in documents:
+        text = str(document)
+        document_term_ids = set()
+        if match == MATCH_WORD:
+            for token in WORD_PATTERN.findall(text.lower()):
+                term_id = vocabulary.get(token)
+                if term_id is not None:
+                    document_term_ids.add(term_id)
+        else:
+            for token in set(WORD_PATTERN.findall(text)):
+                term_ids = token_cache.get(token)
+                if term_ids is None:
+                    term_ids = substring_term_ids(token, vocabulary, max_term_length)
+                    token_cache[token] = term_ids
+                document_term_ids.update(term_ids)
+        indices.extend(sorted(document_term_ids))
+        indptr.append(len(indices))
+
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix((data, np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int64)),
+                             shape=(len(indptr) - 1, len(vocabulary)))
+
+
+# Function to calculate the IDF score of every term at once
+# IDF = log(total number of documents / number of documents containing the term), 0 for unseen terms
+def calculate_idf_scores(documents, terms, match=MATCH_SUBSTRING):
+    terms = list(terms)
+    vocabulary = {term: term_id for term_id, term in enumerate(terms)}
+    matrix = build_document_term_matrix(documents, vocabulary, match)
+
+    total_documents = matrix.shape[0]
+    document_frequencies = np.asarray(matrix.sum(axis=0)).ravel()
+
+    idf_scores = np.zeros(len(terms), dtype=np.float64)
+    seen = document_frequencies > 0
+    idf_scores[seen] = np.log(total_documents / document_frequencies[seen])
+
+    return dict(zip(terms, idf_scores.tolist()))
+
+
+# Function to calculate the smoothed IDF score of each term id from an array of document frequencies:
+# IDF = log(total number of documents / (1 + number of documents containing the term)), rounded to 2 decimals
+def calculate_idf_array(document_frequencies, total_documents):
+    # Many terms share a document frequency, so each distinct frequency is scored only once
+    distinct_frequencies, inverse = np.unique(np.asarray(document_frequencies, dtype=np.int64), return_inverse=True)
+    distinct_scores = [round(math.log(total_documents / (1 + df)), 2) for df in distinct_frequencies.tolist()]
+    return np.asarray(distinct_scores, dtype=np.float64)[inverse.reshape(-1)]
+
+
+# Function to round scores to 2 decimals exactly as round() does, vectorized; np.round scales by 100 first,
+# which can put a score on the wrong side of a tie, so scores close to a tie are rounded one at a time
+def round_scores(scores, decimals=2):
+    scores = np.asarray(scores, dtype=np.float64)
+    rounded = np.round(scores, decimals)
+    scaled = scores * 10 ** decimals
+    near_ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    rounded[near_ties] = [round(score, decimals) for score in scores[near_ties].tolist()]
+    return rounded
+
+
+# Function to order term ids from the highest to the lowest IDF score, ties kept in order of first occurrence
+def rank_by_idf(inverse_document_frequencies, max_terms=None):
+    return np.argsort(-np.asarray(inverse_document_frequencies), kind='stable')[:max_terms]
@@ -0,0 +1,123 @@
+import argparse
+import os
+import struct
+import threading
+import numpy as np
+from corpus import InternedCorpus, Vocabulary, add_document_frequencies
+from idf_engine import calculate_idf_array
+from ingest import DEFAULT_CHUNK_SIZE, hash_stream, iter_text_chunks
+from preprocessing import DEFAULT_WORKERS, preprocess_and_tag_chunk
+
+# File layout, little-endian and 8-byte aligned so every array can be memory-mapped in place:
+#   header: magic, total documents, number of terms
+#   int64[terms] document frequencies | float64[terms] IDF scores
+#   int64[terms + 1] offsets into the term text | UTF-8 term text
+MAGIC = b'MDNIDF01'
+HEADER = struct.Struct('<8sQQ')
+
+
+# Document-frequency table fitted on a reference corpus, used to score new documents without refitting
+class IDFModel:
+    def __init__(self, terms, document_frequencies, total_documents, inverse_document_frequencies=None,
+                 fingerprint=None):
+        # IDF is undefined without reference documents (log of 0), e.g. for a CSV file with only a header
+        if total_documents <= 0:
+            raise ValueError("An IDF model needs at least one reference document")
+        self.vocabulary = Vocabulary(terms)
+        self.document_frequencies = document_frequencies
+        self.total_documents = total_documents
+        if inverse_document_frequencies is None:
+            inverse_document_frequencies = calculate_idf_array(document_frequencies, total_documents)
+        self.inverse_document_frequencies = inverse_document_frequencies
+        # IDF of a term the reference corpus never saw (document frequency 0)
+        self.unseen_idf = float(calculate_idf_array(np.zeros(1, dtype=np.int64), total_documents)[0])
+        self.fingerprint = fingerprint
+
+    # Fit the model on chunks of noun term lists, counting each term once per document
+    @classmethod
+    def fit(cls, noun_terms_chunks):
+        vocabulary = Vocabulary()
+        document_frequencies = np.zeros(0, dtype=np.int64)
+        total_documents = 0
+        for noun_terms_chunk in noun_terms_chunks:
+            chunk_corpus = InternedCorpus(vocabulary).add_documents(noun_terms_chunk)
+            document_frequencies = add_document_frequencies(document_frequencies,
+                                                            chunk_corpus.document_frequencies())
+            total_documents += len(chunk_corpus)
+        document_frequencies = add_document_frequencies(np.zeros(len(vocabulary), dtype=np.int64),
+                                                        document_frequencies)
+        return cls(vocabulary.terms, document_frequencies, total_documents)
+
+    # Write the model to a single binary file, replacing any previous file atomically
+    def save(self, path):
+        encoded_terms = [term.encode('utf-8') for term in self.vocabulary.terms]
+        term_offsets = np.concatenate(([0], np.cumsum([len(term) for term in encoded_terms], dtype=np.int64)))
+
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, self.total_documents, len(encoded_terms)))
+            f.write(np.asarray(self.document_frequencies, dtype='<i8').tobytes())
+            f.write(np.asarray(self.inverse_document_frequencies, dtype='<f8').tobytes())
+            f.write(term_offsets.astype('<i8').tobytes())
+            f.write(b''.join(encoded_terms))
+        os.replace(tmp_path, path)
+
+    # Load a model written by save, memory-mapping its arrays instead of reading them into memory
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            magic, total_documents, term_count = HEADER.unpack(f.read(HEADER.size))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not an IDF model file")
+            f.seek(0)
+            fingerprint = hash_stream(f)
+
+        offset = HEADER.size
+        document_frequencies = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(term_count,))
+        offset += 8 * term_count
+        inverse_document_frequencies = np.memmap(path, dtype='<f8', mode='r', offset=offset, shape=(term_count,))
+        offset += 8 * term_count
+        term_offsets = np.memmap(path, dtype='<i8', mode='r', offset=offset, shape=(term_count + 1,))
+        offset += 8 * (term_count + 1)
+
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            term_text = f.read()
+        bounds = term_offsets.tolist()
+        terms = [term_text[start:end].decode('utf-8') for start, end in zip(bounds[:-1], bounds[1:])]
+
+        return cls(terms, document_frequencies, total_documents, inverse_document_frequencies, fingerprint)
+
+    # IDF scores aligned with the term ids of another vocabulary, for scoring new documents against the model
+    def idf_for(self, vocabulary):
+        model_ids = np.array([self.vocabulary.get(term, -1) for term in vocabulary.terms], dtype=np.int64)
+        scores = np.full(len(model_ids), self.unseen_idf, dtype=np.float64)
+        known = model_ids >= 0
+        scores[known] = self.inverse_document_frequencies[model_ids[known]]
+        return scores
+
+
+# Function to fit an IDF model on a one-column reference CSV file and save it
+def fit_csv(source, output_path, enable_automatic_correction=False, chunk_size=DEFAULT_CHUNK_SIZE,
+            workers=DEFAULT_WORKERS):
+    noun_terms_chunks = (preprocess_and_tag_chunk(chunk, enable_automatic_correction, workers)[1]
+                         for chunk in iter_text_chunks(source, chunk_size))
+    model = IDFModel.fit(noun_terms_chunks)
+    model.save(output_path)
+    return model
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Fit an IDF model on a one-column reference CSV file')
+    parser.add_argument('source', help='reference CSV file')
+    parser.add_argument('output', help='model file to write')
+    parser.add_argument('--autocorrect', action='store_true', help='autocorrect spelling before tagging')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='CSV rows read at once')
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help='preprocessing worker processes')
+    args = parser.parse_args()
+
+    try:
+        fitted = fit_csv(args.source, args.output, args.autocorrect, args.chunk_size, args.workers)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Fitted {len(fitted.vocabulary)} terms on {fitted.total_documents} documents")
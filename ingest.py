@@ -0,0 +1,51 @@
+import hashlib
+import pandas as pd
+
+# Default number of CSV rows read at once in streaming mode
+DEFAULT_CHUNK_SIZE = 10000
+
+# Size of the blocks read when hashing an upload
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+# Raised when an uploaded CSV does not have exactly one column
+class SingleColumnError(ValueError):
+    pass
+
+
+# Function to hash a file-like object block by block and rewind it for reading
+def hash_stream(stream):
+    digest = hashlib.sha256()
+    for block in iter(lambda: stream.read(HASH_BLOCK_SIZE), b''):
+        digest.update(block)
+    stream.seek(0)
+    return digest.hexdigest()
+
+
+# Function to read the single text column of a CSV file in chunks of rows
+def iter_text_chunks(source, chunk_size=DEFAULT_CHUNK_SIZE):
+    for chunk in pd.read_csv(source, chunksize=chunk_size):
+        if len(chunk.columns) != 1:
+            raise SingleColumnError("Please provide only a one-column dataset")
+        yield chunk.iloc[:, 0]
+
+
+# Function to read the single text column of a Parquet file in batches of rows (requires pyarrow)
+def iter_parquet_text_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Reading Parquet files requires pyarrow (pip install pyarrow)") from None
+
+    parquet_file = pq.ParquetFile(path)
+    if len(parquet_file.schema_arrow) != 1:
+        raise SingleColumnError("Please provide only a one-column dataset")
+    for batch in parquet_file.iter_batches(batch_size=chunk_size):
+        yield batch.column(0).to_pandas()
+
+
+# Function to read the single text column of a CSV or Parquet file, chosen by its extension
+def iter_file_text_chunks(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    if str(path).lower().endswith('.parquet'):
+        return iter_parquet_text_chunks(path, chunk_size)
+    return iter_text_chunks(path, chunk_size)
@@ -0,0 +1,118 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Default size of the background worker pool, number of jobs remembered and time a finished job is kept
+DEFAULT_WORKERS = 2
+DEFAULT_MAX_JOBS = 256
+DEFAULT_TTL_SECONDS = 60 * 60
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+
+# Background analysis job with its stage and row progress
+class Job:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = QUEUED
+        self.stage = None
+        self.rows_processed = 0
+        self.created_at = time.time()
+        self.started_at = None
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        # Once fetched, the result is handed to a result store and only its id is kept here
+        self.result_id = None
+        self._hand_off_lock = threading.Lock()
+
+    # Progress callback passed to the analysis: the current stage and, optionally, rows processed so far
+    def update(self, stage, rows_processed=None):
+        self.stage = stage
+        if rows_processed is not None:
+            self.rows_processed = rows_processed
+
+    # Function to move the result into a store (anything with add(result) -> id) on the first call,
+    # so the job stops holding it, and return its id in the store
+    def hand_off_result(self, store):
+        with self._hand_off_lock:
+            if self.result is not None:
+                self.result_id = store.add(self.result)
+                self.result = None
+            return self.result_id
+
+    def to_dict(self):
+        elapsed = 0.0
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+        return {
+            'job_id': self.id,
+            'status': self.status,
+            'stage': self.stage,
+            'rows_processed': self.rows_processed,
+            'elapsed_seconds': round(elapsed, 2),
+            'rows_per_second': round(self.rows_processed / elapsed, 2) if elapsed > 0 else 0.0,
+            'error': self.error,
+        }
+
+
+# Runs analyses on a background worker pool and keeps the most recent jobs for polling,
+# finished jobs for at most ttl_seconds
+class JobManager:
+    def __init__(self, workers=DEFAULT_WORKERS, max_jobs=DEFAULT_MAX_JOBS, ttl_seconds=DEFAULT_TTL_SECONDS):
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='medinym-job')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _run(self, job, func, args, kwargs):
+        job.status = RUNNING
+        job.started_at = time.time()
+        try:
+            job.result = func(*args, progress=job.update, **kwargs)
+            job.status = DONE
+        except Exception as e:
+            job.error = str(e)
+            job.status = FAILED
+        finally:
+            job.finished_at = time.time()
+
+    def _forget_old_jobs(self):
+        # Only finished jobs are forgotten: expired ones, then the oldest while there are too many
+        expired_before = time.time() - self.ttl_seconds
+        for job_id in list(self._jobs):
+            job = self._jobs[job_id]
+            if job.status in (DONE, FAILED) and (len(self._jobs) > self.max_jobs or job.finished_at < expired_before):
+                del self._jobs[job_id]
+
+    # Function to queue func(*args, progress=..., **kwargs) and return its job right away
+    def submit(self, func, *args, **kwargs):
+        job = Job()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        self._executor.submit(self._run, job, func, args, kwargs)
+        return job
+
+    # Function to add a job whose result is already known, e.g. from the result cache
+    def add_finished(self, result):
+        job = Job()
+        job.result = result
+        job.status = DONE
+        job.stage = DONE
+        job.started_at = job.finished_at = time.time()
+        with self._lock:
+            self._jobs[job.id] = job
+            self._forget_old_jobs()
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            self._forget_old_jobs()
+            return self._jobs.get(job_id)
@@ -0,0 +1,54 @@
+import re
+from functools import lru_cache
+import pandas as pd
+
+# De-identified PHI markers, standalone numbers and any other non-alphanumeric character,
+# all replaced by a space in a single pass
+NOISE_PATTERN = re.compile(r'\[\*\*.*?\*\*\]|\b\d+\b|[^a-zA-Z0-9\s]')
+
+
+# Function to check that an NLTK data package is installed locally, without any network access
+def require_nltk_data(resource, package):
+    # NLTK is imported on first use, since importing it pulls in scipy.stats and takes over a second
+    import nltk
+    try:
+        nltk.data.find(resource)
+    except LookupError:
+        raise LookupError(f"NLTK data package '{package}' is not installed; install it with "
+                          f"`python -m nltk.downloader {package}` or point NLTK_DATA at a bundled copy") from None
+
+
+# Function to load the NLTK English stop words once per process
+@lru_cache(maxsize=None)
+def english_stop_words():
+    require_nltk_data('corpora/stopwords', 'stopwords')
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+
+# Function to remove PHI markers, numbers and punctuation, collapse spaces and lowercase a document
+def normalize_text(doc):
+    return ' '.join(NOISE_PATTERN.sub(' ', doc).lower().split())
+
+
+# Function to preprocess each document: normalize it and drop English stop words
+def preprocess_document(doc, stop_words=None):
+    if stop_words is None:
+        stop_words = english_stop_words()
+    return ' '.join(word for word in NOISE_PATTERN.sub(' ', doc).lower().split() if word not in stop_words)
+
+
+# Function to normalize a list or pandas Series of documents with vectorized string operations
+def normalize_documents(documents):
+    series = documents if isinstance(documents, pd.Series) else pd.Series(documents, dtype=object)
+    cleaned = series.str.replace(NOISE_PATTERN, ' ', regex=True).str.lower()
+    return [' '.join(doc.split()) for doc in cleaned]
+
+
+# Function to preprocess a list or pandas Series of documents with vectorized string operations
+def preprocess_documents(documents, stop_words=None):
+    if stop_words is None:
+        stop_words = english_stop_words()
+    series = documents if isinstance(documents, pd.Series) else pd.Series(documents, dtype=object)
+    cleaned = series.str.replace(NOISE_PATTERN, ' ', regex=True).str.lower()
+    return [' '.join(word for word in doc.split() if word not in stop_words) for doc in cleaned]
@@ -0,0 +1,117 @@
+import os
+import shutil
+import tempfile
+import numpy as np
+from corpus import Vocabulary, row_means, top_k_per_row
+from idf_engine import calculate_idf_array, round_scores
+from score_writers import DOCUMENT_SCORE_COLUMNS, open_score_writer
+
+# Number of spilled documents read back at once in the second pass
+DEFAULT_BLOCK_SIZE = 100000
+
+# Number of rarest terms reported per document
+TOP_TERMS = 10
+
+LENGTHS_FILE = 'lengths.u32'
+TERM_IDS_FILE = 'term_ids.u32'
+
+
+# Function to run the first pass: count document frequencies and spill each document's term ids to disk
+def spill_term_ids(noun_terms_documents, spill_dir):
+    vocabulary = Vocabulary()
+    document_frequencies = []
+    total_documents = 0
+
+    with open(os.path.join(spill_dir, LENGTHS_FILE), 'wb') as lengths_file, \
+            open(os.path.join(spill_dir, TERM_IDS_FILE), 'wb') as term_ids_file:
+        for noun_terms in noun_terms_documents:
+            term_ids = vocabulary.intern_many(noun_terms)
+            document_frequencies.extend([0] * (len(vocabulary) - len(document_frequencies)))
+            for term_id in set(term_ids.tolist()):
+                document_frequencies[term_id] += 1
+
+            np.array([len(term_ids)], dtype=np.uint32).tofile(lengths_file)
+            term_ids.astype(np.uint32).tofile(term_ids_file)
+            total_documents += 1
+
+    return vocabulary.terms, np.array(document_frequencies, dtype=np.int64), total_documents
+
+
+# Function to stream the spilled term ids back from disk as CSR blocks of (term ids, offsets)
+def iter_spilled_blocks(spill_dir, block_size=DEFAULT_BLOCK_SIZE):
+    with open(os.path.join(spill_dir, LENGTHS_FILE), 'rb') as lengths_file, \
+            open(os.path.join(spill_dir, TERM_IDS_FILE), 'rb') as term_ids_file:
+        while True:
+            lengths = np.fromfile(lengths_file, dtype=np.uint32, count=block_size)
+            if len(lengths) == 0:
+                break
+            term_ids = np.fromfile(term_ids_file, dtype=np.uint32, count=int(lengths.sum()))
+            offsets = np.concatenate(([0], np.cumsum(lengths, dtype=np.int64)))
+            yield term_ids.astype(np.int32), offsets
+
+
+# Function to score one CSR block of documents as output columns, numbering the rows from first_index
+def score_block(term_ids, offsets, terms, inverse_document_frequencies, first_index=1):
+    average_idf = row_means(inverse_document_frequencies[term_ids], offsets)
+    top_offsets, top_ids = top_k_per_row(term_ids, offsets, inverse_document_frequencies, TOP_TERMS)
+    top_term_names = [terms[term_id] for term_id in top_ids.tolist()]
+    top_term_scores = inverse_document_frequencies[top_ids].tolist()
+
+    rarest_terms = []
+    term_rarity_scores = []
+    top_offsets = top_offsets.tolist()
+    for start, end in zip(top_offsets[:-1], top_offsets[1:]):
+        if end > start:
+            rarest_terms.append(top_term_names[start:end])
+            term_rarity_scores.append(top_term_scores[start:end])
+        else:
+            rarest_terms.append([])
+            term_rarity_scores.append([0.0] * TOP_TERMS)
+
+    return {
+        'Index': list(range(first_index, first_index + len(average_idf))),
+        'Rarity Score': round_scores(average_idf).tolist(),
+        'Rarest Terms': rarest_terms,
+        'Term Rarity Score': term_rarity_scores,
+    }
+
+
+# Function to run the second pass: write the rarity score and rarest terms of each spilled document,
+# scoring a whole block of documents at once and adding its scores to optional running statistics
+def write_document_scores(spill_dir, terms, inverse_document_frequencies, output_path,
+                          block_size=DEFAULT_BLOCK_SIZE, output_format=None, statistics=None):
+    writer = open_score_writer(output_path, DOCUMENT_SCORE_COLUMNS, output_format)
+    try:
+        index = 1
+        for term_ids, offsets in iter_spilled_blocks(spill_dir, block_size):
+            block = score_block(term_ids, offsets, terms, inverse_document_frequencies, index)
+            writer.write(block)
+            if statistics is not None:
+                statistics.update(block['Rarity Score'])
+            index += len(offsets) - 1
+    finally:
+        writer.close()
+
+
+# Function to score a stream of noun term lists against their own document frequencies
+# without holding the documents in memory, writing one CSV, JSONL or Parquet row per document
+def score_out_of_core(noun_terms_documents, output_path, spill_dir=None, block_size=DEFAULT_BLOCK_SIZE,
+                      output_format=None, statistics=None):
+    own_spill_dir = spill_dir is None
+    if own_spill_dir:
+        spill_dir = tempfile.mkdtemp(prefix='medinym-spill-')
+    else:
+        os.makedirs(spill_dir, exist_ok=True)
+
+    try:
+        terms, document_frequencies, total_documents = spill_term_ids(noun_terms_documents, spill_dir)
+
+        inverse_document_frequencies = calculate_idf_array(document_frequencies, total_documents)
+
+        write_document_scores(spill_dir, terms, inverse_document_frequencies, output_path, block_size,
+                              output_format, statistics)
+    finally:
+        if own_spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+    return total_documents
@@ -1,356 +1,272 @@
-from flask import Flask, request, render_template_string
+from flask import Blueprint, Flask, Response, request, render_template_string, jsonify, send_file, url_for
 import pandas as pd
-import re
-import math
-import nltk
-from nltk.corpus import stopwords
-from autocorrect import Speller
-import matplotlib.pyplot as plt
-import matplotlib.colors as mcolors
-import io
-import base64
-from matplotlib.figure import Figure
+import array
+import copy
+import os
+import tempfile
+import threading
 import numpy as np
-import mpld3
-from mpld3 import plugins
-import spacy
-from IPython.display import display
-
-# Load the spaCy language model
-nlp = spacy.load('en_core_web_sm')
-
-# Download the stopwords corpus if not already downloaded
-nltk.download('stopwords')
-
-app = Flask(__name__)
-
-
-# Function to check if a token is a noun or a proper noun
-def is_noun_or_proper_noun(token):
-    return token.pos_ in {'NOUN', 'PROPN'}
-
-
-# Function to calculate the Outlier Score (OS) and Inverse Document Frequency (IDF)
-def calculate_OS_IDF(collection):
-    # Initialize dictionaries to store document frequencies (DF) and inverse document frequencies (IDF)
-    document_frequencies = {}
-    inverse_document_frequencies = {}
-
-    # Tokenize documents into terms using spaCy
-    tokenized_documents = [nlp(doc) for doc in collection]
-
-    # Extract all noun and proper noun terms from each document
-    noun_terms_documents = []
-    for doc in tokenized_documents:
-        noun_terms = [token.text for token in doc if is_noun_or_proper_noun(token)]
-        noun_terms_documents.append(noun_terms)
-        unique_terms = set(noun_terms)
-        for term in unique_terms:
-            document_frequencies[term] = document_frequencies.get(term, 0) + 1
-
-    # Total number of documents (each row counts as one document)
-    total_documents = len(collection)
-
-    # Calculate IDF score for each term
-    for term, df in document_frequencies.items():
-        inverse_document_frequencies[term] = round(math.log(total_documents / (1 + df)), 2)
-
-    # Calculate average IDF per document (each row counts as one document)
-    average_term_idf_per_document = []
-    max_idf_scores = []
-    rarest_terms = []
-
-    for doc in noun_terms_documents:
-        doc_idf_values = [inverse_document_frequencies.get(term, 0) for term in doc]
-        if doc_idf_values:
-            avg_idf = round(sum(doc_idf_values) / len(doc), 2)
-            sorted_terms = sorted(set(doc), key=lambda term: -inverse_document_frequencies.get(term, 0))
-            rarest_term = ', '.join(sorted_terms[:10])
-            max_idf = [f"{inverse_document_frequencies.get(term, 0):.2f}" for term in sorted_terms[:10]]
-        else:
-            avg_idf = 0
-            max_idf = [f"{0:.2f}" for _ in range(10)]
-            rarest_term = ""
-
-        average_term_idf_per_document.append(f"{avg_idf:.2f}")
-        max_idf_scores.append(max_idf)
-        rarest_terms.append(rarest_term)
-
-    return average_term_idf_per_document, max_idf_scores, rarest_terms
-
-
-# Function to preprocess each document
-def preprocess_document(doc):
-    doc = re.sub(r'\[\*\*.*?\*\*\]', ' ', doc)
-    doc = re.sub(r'\b\d+\b', ' ', doc)
-    doc = re.sub(r'[^a-zA-Z0-9\s]', ' ', doc)
-    doc = re.sub(r'\s+', ' ', doc)
-    doc = doc.lower()
-
-    stop_words = set(stopwords.words('english'))
-    tokens = doc.split()
-    filtered_tokens = [word for word in tokens if word not in stop_words]
-    doc = ' '.join(filtered_tokens)
-
-    return doc.strip()
-
-
-# Function to correct spelling using autocorrect library
-def autocorrect_spelling(doc):
-    spell = Speller(fast=True)
-    return spell(doc)
-
-
-@app.route('/')
-def index():
-    return render_template_string("""
-        <!DOCTYPE html>
-<html lang="en">
-<head>
-    <meta charset="UTF-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>Outlier Analyzer</title>
-    <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/css/bootstrap.min.css">
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css">
-
-    <style>
-        .container {
-            margin-top: 50px;
-        }
-        .card-header {
-            background-color: #66cc00;
-            color: white;
-        }
-        .card-body {
-            background-color: #f8f9fa; /* Light gray background */
-        }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1 class="text-center mb-4">Outlier Document</h1>
-        <div class="card">
-            <div class="card-header">
-                <h4 class="card-title">Upload CSV</h4>
-            </div>
-            <div class="card-body">
-                <form method="post" action="/upload" enctype="multipart/form-data">
-                    <div class="form-group">
-                        <input type="file" name="file" class="form-control-file">
-                    </div>
-                    <div class="form-check">
-                        <input class="form-check-input" type="checkbox" name="enable_automatic_correction" value="1" id="enableCorrectionCheckbox">
-                        <label class="form-check-label" for="enableCorrectionCheckbox">
-                        Enable Automatic Spelling Correction
-                        </label>
-
-                    </div>
-                    <!-- Added tooltip to the upload button -->
-                    <button type="submit" class="btn btn-primary" data-toggle="tooltip"  data-placement="right" title="Upload only one column file!">Upload</button>
-                </form>
-            </div>
-        </div>
-    </div>
-    <script src="https://code.jquery.com/jquery-3.5.1.min.js"></script>
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/popper.js/1.16.0/umd/popper.min.js"></script>
-    <script src="https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/js/bootstrap.min.js"></script>
-    <script>
-        // Activate Bootstrap tooltips
-        $(document).ready(function(){
-            $('[data-toggle="tooltip"]').tooltip();
-        });
-
-        // Form submission handler
-        $('#uploadForm').on('submit', function(event) {
-            const fileInput = $('input[name="file"]');
-            const file = fileInput[0].files[0];
-            if (!file) {
-                event.preventDefault();
-                $('#alertMessage').text('No file provided').show();
-            } else if (!file.name.endsWith('.csv')) {
-                event.preventDefault();
-                $('#alertMessage').text('Please upload a CSV file').show();
-            }
-        });
-
-    </script>
-</body>
-</html>
+from preprocessing import (DEFAULT_TAG_BATCH_SIZE, DEFAULT_TAG_PROCESSES, DEFAULT_WORKERS,
+                           preprocess_and_tag_chunk_with_offsets)
+from highlighting import gradient_colors, highlight_spans, render_highlighted_text
+from histogram import cached_histogram_png, render_histogram_html, score_histogram
+from rarity_stats import RarityStatistics
+from result_cache import content_cache_key, shared_result_cache
+from idf_engine import round_scores
+from idf_model import IDFModel
+from corpus import IncrementalCorpus, pad_rows
+from ingest import SingleColumnError, hash_stream, iter_text_chunks
+from export import export_document_scores, export_term_scores
+from score_writers import ARROW, CSV, JSONL, PARQUET
+from jobs import DONE, FAILED, JobManager
+from analysis_store import AnalysisStore
+
+blueprint = Blueprint('outlier_doc', __name__)
+
+# Cache of analysis results keyed by upload content and options, shared with the word analysis
+result_cache = shared_result_cache()
+
+# Background worker pool for long-running analyses submitted through /jobs
+job_manager = JobManager()
+
+# Per-session store of finished analyses whose rows are served a page at a time
+analysis_store = AnalysisStore()
+
+# Reference IDF model that uploads are scored against instead of their own document frequencies
+# (set MEDINYM_IDF_MODEL to a file written by `python idf_model.py reference.csv model.idf`)
+idf_model = IDFModel.load(os.environ['MEDINYM_IDF_MODEL']) if os.environ.get('MEDINYM_IDF_MODEL') else None
+
+# Serializes appends to stored analyses with the rescoring done when their rows are read
+append_lock = threading.Lock()
+
+# Number of rarest terms kept for each document
+TOP_TERMS = 10
+
+# Columns of the results table and the number of rows fetched per page
+RESULT_COLUMNS = ['Index', 'Original Text', 'Preprocessed Text', 'Rarity Score', 'Rarest Terms', 'Term Rarity Score']
+PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+
+# File extension of each export format
+EXPORT_EXTENSIONS = {PARQUET: '.parquet', ARROW: '.arrow', CSV: '.csv', JSONL: '.jsonl'}
+
+# Layout of cached analysis results, part of their cache key so results cached by an older layout are not reused
+RESULT_VERSION = 9
+
+
+# Function to calculate the rarity score and rarest terms of each document of an interned corpus as typed arrays:
+# the average IDF rounded to 2 decimals, and k-column matrices of the rarest term ids (padded with -1)
+# and their IDF (padded with 0), ranked from rarest
+def score_documents(corpus, inverse_document_frequencies, top_terms=TOP_TERMS):
+    # Score every document at once: mean IDF per row and the top-k rarest distinct terms per row
+    average_idf = corpus.document_means(inverse_document_frequencies)
+    top_offsets, top_ids = corpus.top_terms(inverse_document_frequencies, top_terms)
+
+    rarity_scores = round_scores(average_idf).astype(np.float32)
+    top_term_ids = pad_rows(top_ids, top_offsets, top_terms, -1)
+    top_term_scores = pad_rows(inverse_document_frequencies[top_ids].astype(np.float32), top_offsets, top_terms)
+    return rarity_scores, top_term_ids, top_term_scores
+
+
+# Function to append preprocessed and tagged documents to an analysis, leaving its scores to be refreshed;
+# the character offset of each noun term is kept alongside the corpus for highlighting
+def append_documents(result, original_documents, preprocessed_documents, noun_terms_documents,
+                     term_offsets_documents):
+    result['original_documents'].extend(original_documents)
+    result['preprocessed_documents'].extend(preprocessed_documents)
+    result['corpus'].add_documents(noun_terms_documents)
+    for term_offsets in term_offsets_documents:
+        result['term_char_offsets'].extend(term_offsets)
+
+
+# Function to give the IDF of every term of an analysis: the reference model's IDF for score-only analyses,
+# otherwise the IDF of its own documents
+def analysis_idf(result):
+    corpus = result['corpus']
+    if result.get('score_only'):
+        return idf_model.idf_for(corpus.vocabulary)
+    return corpus.inverse_document_frequencies()
+
+
+# Function to rescore an analysis' documents if documents were appended since it was last scored
+def refresh_scores(result):
+    corpus = result['corpus']
+    if result.get('scored_documents') == len(corpus):
+        return result
+
+    rarity_scores, top_term_ids, top_term_scores = score_documents(corpus, analysis_idf(result))
+
+    # Against a fixed reference model earlier rows keep their scores, so only the new rows are added to the
+    # running statistics; against the documents' own IDF every score may have changed
+    statistics = result.get('statistics')
+    if result.get('score_only') and statistics is not None:
+        statistics.update(rarity_scores[result['scored_documents']:])
+    else:
+        statistics = RarityStatistics().update(rarity_scores)
+
+    # A PNG image of the previous scores is out of date
+    result.pop('histogram_png', None)
+    result.update({
+        'rarity_scores': rarity_scores,
+        'top_term_ids': top_term_ids,
+        'top_term_scores': top_term_scores,
+        'rarity_order': np.argsort(rarity_scores, kind='stable'),
+        'statistics': statistics,
+        'histogram': score_histogram(statistics, 'Rarity Score Frequencies', 'Outlier Score', half_max_line=True),
+        'scored_documents': len(corpus),
+    })
+    return result
+
+
+# Function to copy an analysis before appending to it, so the cached upload result is left untouched
+def copy_for_append(result):
+    return dict(result, original_documents=list(result['original_documents']),
+                preprocessed_documents=list(result['preprocessed_documents']),
+                corpus=copy.deepcopy(result['corpus']), term_char_offsets=copy.copy(result['term_char_offsets']),
+                statistics=copy.deepcopy(result['statistics']), appendable=True)
+
+
+# Function to render the preprocessed text of one row with its rarest terms highlighted,
+# from the term offsets kept at analysis time and within the per-row highlighting budget
+def highlighted_text(result, row):
+    corpus = result['corpus']
+    start, end = corpus.document_span(row)
+    term_ids, _ = corpus.rows(row, row + 1)
+    top_ids = result['top_term_ids'][row]
+    count = np.count_nonzero(top_ids >= 0)
+    spans = highlight_spans(term_ids, result['term_char_offsets'][start:end], top_ids[:count],
+                            corpus.vocabulary.terms)
+    colors = gradient_colors(result['top_term_scores'][row, :count])
+    return render_highlighted_text(result['preprocessed_documents'][row], spans, colors)
+
+
+# Function to format one row of an analysis for the results table: scores with 2 decimals and the rarest
+# terms joined by commas, or 0 for each of the top terms of a document without terms
+def format_result_row(result, row):
+    terms = result['corpus'].vocabulary.terms
+    top_ids = result['top_term_ids'][row]
+    count = np.count_nonzero(top_ids >= 0)
+    top_scores = result['top_term_scores'][row, :count] if count else result['top_term_scores'][row]
+    return {
+        'Index': row + 1,
+        'Original Text': result['original_documents'][row],
+        'Preprocessed Text': result['preprocessed_documents'][row],
+        'Highlighted Text': highlighted_text(result, row),
+        'Rarity Score': f"{result['rarity_scores'][row]:.2f}",
+        'Rarest Terms': ', '.join(terms[term_id] for term_id in top_ids[:count].tolist()),
+        'Term Rarity Score': [f"{score:.2f}" for score in top_scores.tolist()],
+    }
 
-    """)
 
+# Function to select one sorted and filtered page of an analysis' rows as JSON-ready records
+def results_window(result, offset=0, limit=PAGE_SIZE, sort='index', order='ascending', term=''):
+    if term:
+        # Rows listing the term among their rarest terms, found in the term id matrix
+        term_id = result['corpus'].vocabulary.get(term, -2)
+        rows = np.flatnonzero((result['top_term_ids'] == term_id).any(axis=1))
+        if sort == 'rarity':
+            rows = rows[np.argsort(result['rarity_scores'][rows], kind='stable')]
+    elif sort == 'rarity':
+        rows = result['rarity_order']
+    else:
+        rows = np.arange(len(result['original_documents']))
+
+    if order == 'descending':
+        rows = rows[::-1]
+
+    records = [format_result_row(result, row) for row in rows[offset:offset + limit].tolist()]
+    return {'total': len(rows), 'offset': offset, 'limit': limit, 'rows': records}
+
+
+# Function to run the document outlier analysis and bin its rarity scores
+def analyze_documents(text_chunks, enable_automatic_correction=False, progress=None, workers=DEFAULT_WORKERS,
+                      score_only=False, batch_size=DEFAULT_TAG_BATCH_SIZE, n_process=DEFAULT_TAG_PROCESSES):
+    # Report the current stage and rows processed so far to an optional progress callback
+    def report(stage, rows_processed=None):
+        if progress is not None:
+            progress(stage, rows_processed)
+
+    result = {
+        'original_documents': [],
+        'preprocessed_documents': [],
+        'corpus': IncrementalCorpus(),
+        'term_char_offsets': array.array('i'),
+        'score_only': score_only,
+    }
 
-@app.route('/upload', methods=['POST'])
-def upload_csv():
+    # Preprocess and tag chunk by chunk, keeping only the interned term ids of each document
+    for chunk in text_chunks:
+        preprocessed_chunk, noun_terms_chunk, term_offsets_chunk = preprocess_and_tag_chunk_with_offsets(
+            chunk, enable_automatic_correction, workers, batch_size, n_process)
+        # Store original text alongside its preprocessed text and terms
+        append_documents(result, chunk.tolist(), preprocessed_chunk, noun_terms_chunk, term_offsets_chunk)
+        report('preprocessing', len(result['original_documents']))
+
+    report('scoring')
+    refresh_scores(result)
+    return result
+
+
+# Function to render the results table header; the rows are fetched a page at a time by the results page
+def render_table_skeleton_html():
+    output_html = pd.DataFrame(columns=RESULT_COLUMNS).to_html(index=False, classes="table table-striped table-hover table-responsive",
+                                                              escape=False)
+
+    output_html = output_html.replace(
+        '<th>Rarity Score</th>',
+        '<th>'
+        + '<div class="dropdown">'
+        + '<button class="btn btn-secondary dropdown-toggle" type="button" id="rarityDropdown" data-toggle="dropdown" aria-haspopup="true" aria-expanded="false">'
+        + '<b data-toggle="tooltip" title="Click to sort rarity scores">Rarity <br> Score</b> <i class="fas fa-filter" style="color: white;"></i>'
+        + '</button>'
+        + '<div class="dropdown-menu" aria-labelledby="rarityDropdown">'
+
+        + '<a class="dropdown-item" href="#" onclick="sortTable(\'rarity\', \'ascending\')">Ascending</a>'
+        + '<a class="dropdown-item" href="#" onclick="sortTable(\'rarity\', \'descending\')">Descending</a>'
+        + '</div></div></th>'
+    )
+
+    output_html = output_html.replace(
+        '<th>Rarest Terms</th>',
+        '<th>'
+        + '<div class="dropdown">'
+        + '<button class="btn btn-secondary dropdown-toggle" type="button" id="termsDropdown" data-toggle="dropdown" aria-haspopup="true" aria-expanded="false">'
+        + '<b id="rarestTermsHeaderText" data-toggle="tooltip" title="Click to filter rarest terms">10 Rarest Terms</b> <i class="fas fa-filter" style="color: white;"></i>'
+        + '</button>'
+        + '<div class="dropdown-menu" aria-labelledby="termsDropdown">'
+        + "".join(
+            [f'<a class="dropdown-item" href="#" onclick="showTopTerms(event, {i}, \'default\')">{i}</a>' for i in
+             range(1, 11)]) +
+        '</div></div></th>'
+    )
+
+    output_html = output_html.replace('<th>Original Text</th>', '<th>Original Text</th>')
+    output_html = output_html.replace('<table', '<div class="table-responsive"><div class="container"><table')
+    output_html = output_html.replace('</table>', '</table></div></div>')
+
+    return output_html
+
+# Function to build the cache key of an upload: its content, the options and the reference model scored against
+def upload_result_key(stream, enable_automatic_correction=False):
+    return content_cache_key(hash_stream(stream), analysis='document', version=RESULT_VERSION,
+                             autocorrect=enable_automatic_correction,
+                             idf_model=idf_model.fingerprint if idf_model is not None else None)
+
+
+# Function to analyze a spooled upload on a background worker and cache the result
+def run_analysis_job(path, cache_key, enable_automatic_correction=False, progress=None):
     try:
-        file = request.files['file']
-        if not file:
-            return render_template_string("""
-                        <script>
-                            window.onload = function() {
-                                alert('No file provided');
-                                window.history.back();
-                            }
-                        </script>
-                    """)
-
-        if not file.filename.endswith('.csv'):
-            return render_template_string("""
-                       <script>
-                           window.onload = function() {
-                               alert('Please upload a CSV file');
-                               window.history.back();
-                           }
-                       </script>
-                   """)
+        with open(path, 'rb') as f:
+            result = analyze_documents(iter_text_chunks(f), enable_automatic_correction, progress=progress,
+                                       score_only=idf_model is not None)
+    finally:
+        os.remove(path)
+    result_cache.put(cache_key, result)
+    return result
 
-        # Read the CSV file
-        df = pd.read_csv(file)
 
-        # Check for single column
-        if len(df.columns) != 1:
-            return render_template_string("<h2>Please provide only a one-column dataset</h2>")
-
-        # Store original text before preprocessing
-        original_documents = df.iloc[:, 0].tolist()
-
-        enable_automatic_correction = request.form.get('enable_automatic_correction') == '1'
-
-
-        # Apply preprocessing and optional autocorrection
-        preprocessed_documents = df.iloc[:, 0].apply(preprocess_document).tolist()
-
-        if enable_automatic_correction:
-            preprocessed_documents = [autocorrect_spelling(doc) for doc in preprocessed_documents]
-
-        average_idf_scores, max_idf_scores, rarest_terms = calculate_OS_IDF(preprocessed_documents)
-
-        output_df = pd.DataFrame({
-            'Index': range(1, len(preprocessed_documents) + 1),
-            'Original Text': original_documents,
-            'Preprocessed Text': preprocessed_documents,
-            'Rarity Score': average_idf_scores,
-            'Rarest Terms': rarest_terms,
-            'Term Rarity Score': max_idf_scores
-
-        })
-
-
-
-        # Calculate the statistics for the histogram
-        rarity_scores = list(map(float, average_idf_scores))
-        mean_score = np.mean(rarity_scores)
-        median_score = np.median(rarity_scores)
-        std_dev_score = np.std(rarity_scores)
-
-        # Generate the histogram
-        fig = Figure()
-        ax = fig.subplots()
-        counts, bins, patches = ax.hist(rarity_scores, bins='auto', color='green', alpha=0.7, edgecolor='black')
-
-        # Plot mean, median, and standard deviation lines
-        ax.axvline(mean_score, color='blue', linestyle='-', linewidth=2, label=f'Mean: {mean_score:.2f}')
-        ax.axhline(y=max(counts) / 2, color='blue', linestyle='-',
-                   linewidth=2)  # Horizontal line at half of the max frequency
-        ax.axvline(median_score, color='orange', linestyle='--', linewidth=2, label=f'Median: {median_score:.2f}')
-        ax.axvline(mean_score + std_dev_score, color='yellow', linestyle='--', linewidth=2,
-                   label=f'Standard Deviation: {std_dev_score:.2f}')
-        ax.axvline(mean_score - std_dev_score, color='yellow', linestyle='--', linewidth=2)
-
-        # Set axis limits to ensure the mean lines are visible
-        ax.set_xlim([min(rarity_scores) - 1, max(rarity_scores) + 1])
-        ax.set_ylim([0, max(counts) + 5])
-
-        ax.set_title('Rarity Score Frequencies')
-        ax.set_xlabel('Outlier Score')
-        ax.set_ylabel('Frequency')
-        ax.legend()
-
-        # Convert the plot to a PNG image and then to a base64 string
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-        histogram_png = base64.b64encode(buf.getvalue()).decode('utf-8')
-        buf.close()
-
-        # Add histogram image to the HTML
-        histogram_html = f'<div style="text-align: center;"><img src="data:image/png;base64,{histogram_png}" alt="Rarity Score Frequencies Histogram"></div>'
-
-        def generate_color_gradient(scores, max_alpha=0.8, alpha_gap=0.05):
-            max_score = max(scores)
-            sorted_scores = sorted(scores, reverse=True)
-
-            colors = []
-            for score in scores:
-                rank = sorted_scores.index(score)
-                alpha = max_alpha - rank * alpha_gap
-                if alpha < 0:
-                    alpha = 0
-                color = f'rgba(255, 0, 0, {alpha})'  # Red color with varying transparency
-                colors.append(color)
-
-            return colors
-
-        def highlightTerms(text, terms, scores):
-            term_scores_map = {term: score for term, score in zip(terms, scores)}
-            sorted_terms = sorted(terms, key=lambda term: -term_scores_map[term])
-            scores_sorted = [term_scores_map[term] for term in sorted_terms]
-            colors = generate_color_gradient(scores_sorted)
-
-            term_color_map = {term: colors[i] for i, term in enumerate(sorted_terms)}
-
-            return ' '.join(
-                [
-                    f"<span style='background-color: {term_color_map[word]};'>{word}</span>" if word in term_color_map else word
-                    for word in text.split()
-                ]
-            )
-
-        # for i, row in output_df.iterrows():
-        # terms = row['Rarest Terms'].split(', ')
-        # term_scores = row['Term Rarity Score']
-        # original_text = row['Original Text']
-        # highlighted_text = apply_highlighting(original_text, terms, term_scores)
-        # output_df.at[i, 'Original Text'] = highlighted_text
-
-        output_html = output_df.to_html(index=False, classes="table table-striped table-hover table-responsive",
-                                        escape=False)
-
-        output_html = output_html.replace(
-            '<th>Rarity Score</th>',
-            '<th>'
-            + '<div class="dropdown">'
-            + '<button class="btn btn-secondary dropdown-toggle" type="button" id="rarityDropdown" data-toggle="dropdown" aria-haspopup="true" aria-expanded="false">'
-            + '<b data-toggle="tooltip" title="Click to sort rarity scores">Rarity <br> Score</b> <i class="fas fa-filter" style="color: white;"></i>'
-            + '</button>'
-            + '<div class="dropdown-menu" aria-labelledby="rarityDropdown">'
-
-            + '<a class="dropdown-item" href="#" onclick="sortTable(\'rarity\', \'ascending\')">Ascending</a>'
-            + '<a class="dropdown-item" href="#" onclick="sortTable(\'rarity\', \'descending\')">Descending</a>'
-            + '</div></div></th>'
-        )
-
-        output_html = output_html.replace(
-            '<th>Rarest Terms</th>',
-            '<th>'
-            + '<div class="dropdown">'
-            + '<button class="btn btn-secondary dropdown-toggle" type="button" id="termsDropdown" data-toggle="dropdown" aria-haspopup="true" aria-expanded="false">'
-            + '<b id="rarestTermsHeaderText" data-toggle="tooltip" title="Click to filter rarest terms">10 Rarest Terms</b> <i class="fas fa-filter" style="color: white;"></i>'
-            + '</button>'
-            + '<div class="dropdown-menu" aria-labelledby="termsDropdown">'
-            + "".join(
-                [f'<a class="dropdown-item" href="#" onclick="showTopTerms(event, {i}, \'default\')">{i}</a>' for i in
-                 range(1, 11)]) +
-            '</div></div></th>'
-        )
-
-
-
-        output_html = output_html.replace('<th>Original Text</th>', '<th>Original Text</th>')
-        output_html = output_html.replace('<table', '<div class="table-responsive"><div class="container"><table')
-        output_html = output_html.replace('</table>', '</table></div></div>')
-
-        return render_template_string("""
+# Page showing the histogram and the results table of a document outlier analysis
+RESULTS_PAGE_TEMPLATE = """
             <!DOCTYPE html>
             <html lang="en">
             <head>
@@ -534,7 +450,7 @@ def upload_csv():
             <body>
 
                 <nav class="navbar navbar-expand-lg">
-                    <a class="navbar-brand" href="/">CSV Analyzer</a>
+                    <a class="navbar-brand" href="{{ url_for('outlier_doc.index') }}">CSV Analyzer</a>
                     <button class="navbar-toggler" type="button" data-toggle="collapse" data-target="#navbarSupportedContent" aria-controls="navbarSupportedContent" aria-expanded="false" aria-label="Toggle navigation">
                         <span class="navbar-toggler-icon"></span>
                     </button>
@@ -550,7 +466,7 @@ def upload_csv():
                             </div>
                         </div>
                     </div>
-                    <form method="post" action="/upload">
+                    <form method="post" action="{{ url_for('outlier_doc.upload_csv') }}">
                         <div class="overlay" id="overlay2">
                             <div class="overlay-content">
                                 <p>You have the option to select the rarest terms and sort the rarity score by clicking on their icons.</p>
@@ -558,6 +474,14 @@ def upload_csv():
                         </div>
 
                     {{ histogram_html|safe }}
+                    <div class="form-inline my-3" id="resultsPager">
+                        <input type="text" class="form-control mr-2" id="termFilter" placeholder="Filter by rarest term">
+                        <button type="button" class="btn btn-secondary mr-2" id="prevPage">Previous</button>
+                        <button type="button" class="btn btn-secondary mr-2" id="nextPage">Next</button>
+                        <span id="pageInfo"></span>
+                        <a class="btn btn-link" href="{{ url_for('outlier_doc.export_results', result_id=result_id) }}">Export scores (Parquet)</a>
+                        <a class="btn btn-link" href="{{ url_for('outlier_doc.export_results', result_id=result_id, table='terms') }}">Export term IDF (Parquet)</a>
+                    </div>
                     {{ table_html|safe }}
                         </div>
                     </form>
@@ -594,7 +518,67 @@ def upload_csv():
 
 
 
+                    // Rows are fetched one page at a time from the results API
+                    const resultId = "{{ result_id }}";
+                    const resultsUrl = "{{ url_for('outlier_doc.index') }}results/";
+                    const resultsQuery = {offset: 0, limit: {{ page_size }}, sort: 'index', order: 'ascending', term: ''};
+                    let topTermsCount = 10;
+
+                    function loadResults(changes) {
+                        Object.assign(resultsQuery, changes || {});
+                        $.getJSON(resultsUrl + resultId, resultsQuery, function(data) {
+                            let tbody = $('table tbody');
+                            if (!tbody.length) {
+                                tbody = $('<tbody>').appendTo($('table'));
+                            }
+                            tbody.empty();
+                            data.rows.forEach(row => {
+                                const tr = $('<tr>');
+                                ['Index', 'Original Text'].forEach(column => {
+                                    tr.append($('<td>').text(row[column]));
+                                });
+                                // The preprocessed text comes escaped and highlighted from the server
+                                tr.append($('<td>').html(row['Highlighted Text']));
+                                ['Rarity Score', 'Rarest Terms'].forEach(column => {
+                                    tr.append($('<td>').text(row[column]));
+                                });
+                                tr.append($('<td>').text(JSON.stringify(row['Term Rarity Score'])));
+                                tbody.append(tr);
+                            });
+                            initRows();
+                            if (topTermsCount !== 10) {
+                                showTopTerms(null, topTermsCount);
+                            }
+
+                            const first = data.total ? data.offset + 1 : 0;
+                            const last = Math.min(data.offset + data.limit, data.total);
+                            $('#pageInfo').text('Showing ' + first + '-' + last + ' of ' + data.total);
+                            $('#prevPage').prop('disabled', data.offset === 0);
+                            $('#nextPage').prop('disabled', data.offset + data.limit >= data.total);
+                        }).fail(function(response) {
+                            $('#pageInfo').text((response.responseJSON && response.responseJSON.error) || 'Could not load results');
+                        });
+                    }
+
+                    $(document).ready(function() {
+                        $('#prevPage').on('click', function() {
+                            loadResults({offset: Math.max(resultsQuery.offset - resultsQuery.limit, 0)});
+                        });
+                        $('#nextPage').on('click', function() {
+                            loadResults({offset: resultsQuery.offset + resultsQuery.limit});
+                        });
+                        $('#termFilter').on('keydown', function(event) {
+                            // Filter on Enter instead of submitting the surrounding form
+                            if (event.key === 'Enter') {
+                                event.preventDefault();
+                                loadResults({offset: 0, term: $(this).val().trim()});
+                            }
+                        });
+                        loadResults();
+                    });
+
                     function showTopTerms(event, count, order) {
+    topTermsCount = count;
     const header = $('#rarestTermsHeaderText');
     header.text(count + ' Rarest Terms');
     const table = $('table').get(0);
@@ -615,123 +599,396 @@ def upload_csv():
         termsCell.innerText = topTerms.join(', ');
         termScoresCell.innerText = topScores.join(', '); // Changed this line
 
-        const originalTextCell = row.cells[2];
-        const originalText = originalTextCell.getAttribute('data-original-text');
-        const updatedText = highlightTerms(originalText, topTerms, topScores);
-        originalTextCell.innerHTML = updatedText;
-    });
-
-    event.preventDefault();
-}
-
-
-function highlightTerms(text, terms, scores) {
-    const termScoresMap = {};
-    terms.forEach((term, index) => {
-        termScoresMap[term] = scores[index];
-    });
-    const sortedTerms = terms.slice().sort((a, b) => termScoresMap[b] - termScoresMap[a]);
-    const sortedScores = sortedTerms.map(term => termScoresMap[term]);
-    const colors = generateColorGradient(sortedScores);
-
-    const termColorMap = {};
-    sortedTerms.forEach((term, index) => {
-        termColorMap[term] = colors[index];
+        // Only the highlights of the top terms shown stay visible
+        $(row.cells[2]).find('span.rare-term').each(function() {
+            const rank = parseInt(this.getAttribute('data-rank'), 10);
+            this.style.backgroundColor = rank < count ? this.getAttribute('data-color') : '';
+        });
     });
 
-    return text.split(' ').map(word => {
-        return termColorMap[word] ? `<span style="background-color: ${termColorMap[word]};">${word}</span>` : word;
-    }).join(' ');
+    if (event) event.preventDefault();
 }
 
-function generateColorGradient(scores, maxAlpha = 0.8, alphaGap = 0.05) {
-    const maxScore = Math.max(...scores);
-    const sortedScores = [...scores].sort((a, b) => b - a);
 
-    return scores.map(score => {
-        const rank = sortedScores.indexOf(score);
-        let alpha = maxAlpha - rank * alphaGap;
-        if (alpha < 0) alpha = 0;
-        return `rgba(255, 0, 0, ${alpha})`;
-    });
-}
-
-// Ensure original terms and scores are stored in data attributes when the table is generated
-$(document).ready(function() {
+// Ensure original terms and scores are stored in data attributes when rows are loaded
+function initRows() {
     $('table tbody tr').each(function() {
-        const originalTextCell = $(this).find('td:eq(2)');
         const termsCell = $(this).find('td:eq(4)');
         const termScoresCell = $(this).find('td:eq(5)');
 
-
-
         termsCell.attr('data-original-terms', termsCell.text());
         const termScores = JSON.parse(termScoresCell.text()).map(score => parseFloat(score).toFixed(2));
         termScoresCell.attr('data-original-scores', JSON.stringify(termScores));
-        originalTextCell.attr('data-original-text', originalTextCell.text());
+    });
+}
+
+    // Sorting is done by the results API over all rows, not just the visible page
+    function sortTable(column, order) {
+        if (column === 'rarity') {
+            loadResults({offset: 0, sort: 'rarity', order: order});
+        } else if (order === 'default') {
+            loadResults({offset: 0, sort: 'index', order: 'ascending'});
+        }
+    }
+                </script>
+            </body>
+            </html>
+        """
 
-        const terms = termsCell.text().split(', ');
 
-        const originalText = originalTextCell.text();
-        const highlightedText = highlightTerms(originalText, terms, termScores);
-        originalTextCell.html(highlightedText);
-    });
-});
+# Function to render the results page of a finished analysis kept in the analysis store under result_id
+def render_results_page(result_id, result):
+    histogram_html = render_histogram_html(result['histogram'],
+                                           url_for('outlier_doc.histogram_png', result_id=result_id))
+    return render_template_string(RESULTS_PAGE_TEMPLATE, table_html=render_table_skeleton_html(),
+                                  histogram_html=histogram_html, result_id=result_id, page_size=PAGE_SIZE)
+
 
-$(document).ready(function () {
-        $('[data-toggle="tooltip"]').tooltip();
+@blueprint.route('/')
+def index():
+    return render_template_string("""
+        <!DOCTYPE html>
+<html lang="en">
+<head>
+    <meta charset="UTF-8">
+    <meta name="viewport" content="width=device-width, initial-scale=1.0">
+    <title>Outlier Analyzer</title>
+    <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/css/bootstrap.min.css">
+    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.4/css/all.min.css">
+
+    <style>
+        .container {
+            margin-top: 50px;
+        }
+        .card-header {
+            background-color: #66cc00;
+            color: white;
+        }
+        .card-body {
+            background-color: #f8f9fa; /* Light gray background */
+        }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1 class="text-center mb-4">Outlier Document</h1>
+        <div class="card">
+            <div class="card-header">
+                <h4 class="card-title">Upload CSV</h4>
+            </div>
+            <div class="card-body">
+                <form id="uploadForm" method="post" action="{{ url_for('outlier_doc.submit_job') }}" enctype="multipart/form-data">
+                    <div class="form-group">
+                        <input type="file" name="file" class="form-control-file">
+                    </div>
+                    <div class="form-check">
+                        <input class="form-check-input" type="checkbox" name="enable_automatic_correction" value="1" id="enableCorrectionCheckbox">
+                        <label class="form-check-label" for="enableCorrectionCheckbox">
+                        Enable Automatic Spelling Correction
+                        </label>
 
-        // Ensure original rarity scores are stored in data attributes when the table is generated
-        $('table tbody tr').each(function () {
-            const rarityScoreCell = $(this).find('td:eq(3)');
-            rarityScoreCell.attr('data-original-rarity', rarityScoreCell.text());
+                    </div>
+                    <!-- Added tooltip to the upload button -->
+                    <button type="submit" class="btn btn-primary" data-toggle="tooltip"  data-placement="right" title="Upload only one column file!">Upload</button>
+                </form>
+                <div id="alertMessage" class="alert alert-danger mt-3" style="display: none;"></div>
+                <div id="jobProgress" class="mt-3" style="display: none;">
+                    <div class="progress">
+                        <div class="progress-bar progress-bar-striped progress-bar-animated" style="width: 100%;"></div>
+                    </div>
+                    <p id="jobStatus" class="mt-2 mb-0"></p>
+                </div>
+            </div>
+        </div>
+    </div>
+    <script src="https://code.jquery.com/jquery-3.5.1.min.js"></script>
+    <script src="https://cdnjs.cloudflare.com/ajax/libs/popper.js/1.16.0/umd/popper.min.js"></script>
+    <script src="https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/js/bootstrap.min.js"></script>
+    <script>
+        // Activate Bootstrap tooltips
+        $(document).ready(function(){
+            $('[data-toggle="tooltip"]').tooltip();
         });
-    });
 
-    function sortTable(column, order) {
-        const table = $('table').get(0);
-        const rows = Array.from(table.rows).slice(1); // Skip the header row
-        const tbody = table.tBodies[0];
+        const jobStatusUrl = "{{ url_for('outlier_doc.job_status', job_id='JOB_ID') }}";
+        const jobResultUrl = "{{ url_for('outlier_doc.job_result', job_id='JOB_ID') }}";
 
-        if (column === 'rarity') {
-            rows.sort((rowA, rowB) => {
-                const cellA = parseFloat(rowA.cells[3].innerText);
-                const cellB = parseFloat(rowB.cells[3].innerText);
-                return order === 'ascending' ? cellA - cellB : cellB - cellA;
+        function showError(message) {
+            $('#jobProgress').hide();
+            $('#uploadForm button[type="submit"]').prop('disabled', false);
+            $('#alertMessage').text(message).show();
+        }
+
+        // Poll the background job, showing its stage and rows processed, and open its results once it is done
+        function pollJob(jobId) {
+            $.getJSON(jobStatusUrl.replace('JOB_ID', jobId)).done(function(job) {
+                if (job.status === 'done') {
+                    window.location = jobResultUrl.replace('JOB_ID', jobId);
+                } else if (job.status === 'failed') {
+                    showError('An error occurred: ' + job.error);
+                } else {
+                    $('#jobStatus').text((job.stage || job.status) + ': ' + job.rows_processed + ' rows processed (' +
+                                         job.rows_per_second + ' rows/s)');
+                    setTimeout(function() { pollJob(jobId); }, 1000);
+                }
+            }).fail(function() {
+                showError('The analysis could not be found, please upload the CSV file again');
             });
+        }
 
-            // Clear the table body
-            while (tbody.firstChild) {
-                tbody.removeChild(tbody.firstChild);
+        // Form submission handler: start the analysis as a background job instead of waiting on the upload
+        $('#uploadForm').on('submit', function(event) {
+            event.preventDefault();
+            const fileInput = $('input[name="file"]');
+            const file = fileInput[0].files[0];
+            if (!file) {
+                $('#alertMessage').text('No file provided').show();
+                return;
+            } else if (!file.name.endsWith('.csv')) {
+                $('#alertMessage').text('Please upload a CSV file').show();
+                return;
             }
 
-            // Append sorted rows
-            rows.forEach(row => tbody.appendChild(row));
-        } else if (order === 'default') {
-            // Reset to default order
-            rows.sort((rowA, rowB) => {
-                const cellA = parseFloat($(rowA).find('td:eq(3)').attr('data-original-rarity'));
-                const cellB = parseFloat($(rowB).find('td:eq(3)').attr('data-original-rarity'));
-                return cellA - cellB;
-            });
+            $('#alertMessage').hide();
+            $('#uploadForm button[type="submit"]').prop('disabled', true);
+            $('#jobStatus').text('Uploading...');
+            $('#jobProgress').show();
+            $.ajax({url: this.action, type: 'POST', data: new FormData(this), processData: false, contentType: false})
+                .done(function(job) { pollJob(job.job_id); })
+                .fail(function(xhr) {
+                    showError((xhr.responseJSON && xhr.responseJSON.error) || 'The upload failed');
+                });
+        });
 
-            // Clear the table body
-            while (tbody.firstChild) {
-                tbody.removeChild(tbody.firstChild);
-            }
+    </script>
+</body>
+</html>
+
+    """)
 
-            // Append rows in the default order
-            rows.forEach(row => tbody.appendChild(row));
-        }
-    }
-                </script>
-            </body>
-            </html>
-        """, table_html=output_html, histogram_html=histogram_html)
+
+@blueprint.route('/upload', methods=['POST'])
+def upload_csv():
+    try:
+        file = request.files['file']
+        if not file:
+            return render_template_string("""
+                        <script>
+                            window.onload = function() {
+                                alert('No file provided');
+                                window.history.back();
+                            }
+                        </script>
+                    """)
+
+        if not file.filename.endswith('.csv'):
+            return render_template_string("""
+                       <script>
+                           window.onload = function() {
+                               alert('Please upload a CSV file');
+                               window.history.back();
+                           }
+                       </script>
+                   """)
+
+        enable_automatic_correction = request.form.get('enable_automatic_correction') == '1'
+
+        # Reuse the previous analysis when the same file is uploaded with the same options
+        cache_key = upload_result_key(file.stream, enable_automatic_correction)
+        result = result_cache.get(cache_key)
+
+        if result is None:
+            # Read the CSV file in chunks, checking for a single column
+            try:
+                result = analyze_documents(iter_text_chunks(file.stream), enable_automatic_correction,
+                                           score_only=idf_model is not None)
+            except SingleColumnError:
+                return render_template_string("<h2>Please provide only a one-column dataset</h2>")
+            result_cache.put(cache_key, result)
+
+        return render_results_page(analysis_store.add(result), result)
 
     except Exception as e:
         return f"An error occurred: {str(e)}"
 
 
+# Job route to start an analysis in the background and return its id right away
+@blueprint.route('/jobs', methods=['POST'])
+def submit_job():
+    try:
+        file = request.files.get('file')
+        if not file:
+            return jsonify({'error': 'No file provided'}), 400
+
+        if not file.filename.endswith('.csv'):
+            return jsonify({'error': 'Please upload a CSV file'}), 400
+
+        enable_automatic_correction = request.form.get('enable_automatic_correction') == '1'
+
+        cache_key = upload_result_key(file.stream, enable_automatic_correction)
+        result = result_cache.get(cache_key)
+        if result is not None:
+            job = job_manager.add_finished(result)
+        else:
+            # Spool the upload to disk, since the request stream is closed once this request returns
+            fd, path = tempfile.mkstemp(prefix='medinym-upload-', suffix='.csv')
+            with os.fdopen(fd, 'wb') as f:
+                file.save(f)
+            job = job_manager.submit(run_analysis_job, path, cache_key, enable_automatic_correction)
+
+        return jsonify(job.to_dict()), 202
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+
+# Job route to poll the stage, rows processed and throughput of an analysis
+@blueprint.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+
+# Job route to fetch the results page once the analysis has finished
+@blueprint.route('/jobs/<job_id>/result', methods=['GET'])
+def job_result(job_id):
+    job = job_manager.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    if job.status == FAILED:
+        return f"An error occurred: {job.error}", 500
+    if job.status != DONE:
+        return jsonify(job.to_dict()), 202
+    # The job hands its result to the analysis store on the first fetch, so it does not keep it alive itself
+    result_id = job.hand_off_result(analysis_store)
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+    return render_results_page(result_id, result)
+
+
+# Results route to fetch one page of an analysis' rows, sorted by index or rarity score and filtered by rarest term
+@blueprint.route('/results/<result_id>', methods=['GET'])
+def results_page(result_id):
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = min(max(int(request.args.get('limit', PAGE_SIZE)), 1), MAX_PAGE_SIZE)
+    except ValueError:
+        return jsonify({'error': 'offset and limit must be integers'}), 400
+
+    sort = request.args.get('sort', 'index')
+    order = request.args.get('order', 'ascending')
+    if sort not in ('index', 'rarity') or order not in ('ascending', 'descending'):
+        return jsonify({'error': 'Unknown sort or order'}), 400
+
+    with append_lock:
+        refresh_scores(result)
+        window = results_window(result, offset, limit, sort, order, request.args.get('term', '').strip())
+    return jsonify(window)
+
+
+# Results route to download the histogram of an analysis' rarity scores as a PNG image, rendered once per scoring
+@blueprint.route('/results/<result_id>/histogram.png', methods=['GET'])
+def histogram_png(result_id):
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+
+    with append_lock:
+        refresh_scores(result)
+        png = cached_histogram_png(result)
+    return Response(png, mimetype='image/png')
+
+
+# Results route to export an analysis' document scores, or the document frequency and IDF of its terms,
+# as a Parquet (default), Arrow, CSV or JSONL file written a block of rows at a time
+@blueprint.route('/results/<result_id>/export', methods=['GET'])
+def export_results(result_id):
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+
+    table = request.args.get('table', 'documents')
+    output_format = request.args.get('format', PARQUET)
+    if table not in ('documents', 'terms') or output_format not in EXPORT_EXTENSIONS:
+        return jsonify({'error': 'Unknown table or format'}), 400
+
+    # Take the IDF and number of rows under the lock; rows appended meanwhile are left out of the export
+    with append_lock:
+        corpus = result['corpus']
+        inverse_document_frequencies = analysis_idf(result)
+        total_documents = len(corpus)
+        document_frequencies = corpus.document_frequencies() if table == 'terms' else None
+
+    fd, path = tempfile.mkstemp(prefix='medinym-export-', suffix=EXPORT_EXTENSIONS[output_format])
+    os.close(fd)
+    try:
+        if table == 'documents':
+            export_document_scores(corpus, inverse_document_frequencies, path, output_format,
+                                   total_documents=total_documents)
+        else:
+            export_term_scores(corpus.vocabulary.terms, document_frequencies,
+                               inverse_document_frequencies[:len(document_frequencies)], path, output_format)
+        export_file = open(path, 'rb')
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 501
+    finally:
+        # The open file keeps the data readable until it has been sent
+        os.remove(path)
+
+    return send_file(export_file, as_attachment=True,
+                     download_name=f'{table}-{result_id}{EXPORT_EXTENSIONS[output_format]}')
+
+
+# Results route to append new rows from a one-column CSV file to an analysis;
+# the existing rows are not reprocessed and all rows are rescored on the next read
+@blueprint.route('/results/<result_id>/append', methods=['POST'])
+def append_results(result_id):
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+
+    file = request.files.get('file')
+    if not file:
+        return jsonify({'error': 'No file provided'}), 400
+    if not file.filename.endswith('.csv'):
+        return jsonify({'error': 'Please upload a CSV file'}), 400
+
+    enable_automatic_correction = request.form.get('enable_automatic_correction') == '1'
+
+    try:
+        # Preprocess and tag the new rows before taking the lock, so reads are not blocked meanwhile
+        tagged_chunks = []
+        for chunk in iter_text_chunks(file.stream):
+            tagged_chunks.append((chunk.tolist(),) + preprocess_and_tag_chunk_with_offsets(
+                chunk, enable_automatic_correction))
+
+        with append_lock:
+            # Look the result up again: an append that held the lock meanwhile may have replaced it with its copy
+            result = analysis_store.get(result_id)
+            if result is None:
+                return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+            if not result.get('appendable'):
+                result = copy_for_append(result)
+                analysis_store.replace(result_id, result)
+            for tagged_chunk in tagged_chunks:
+                append_documents(result, *tagged_chunk)
+            total = len(result['original_documents'])
+    except SingleColumnError:
+        return jsonify({'error': 'Please provide only a one-column dataset'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+    appended = sum(len(tagged_chunk[0]) for tagged_chunk in tagged_chunks)
+    return jsonify({'result_id': result_id, 'appended': appended, 'total': total})
+
+
 if __name__ == '__main__':
+    app = Flask(__name__)
+    app.register_blueprint(blueprint)
     app.run(port=8084, debug=True)
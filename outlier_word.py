@@ -1,97 +1,93 @@
-from flask import Flask, request, render_template_string, jsonify
+from flask import Blueprint, Flask, Response, request, render_template_string, jsonify, send_file, url_for
 import pandas as pd
-import re
-import math
-import nltk
-import spacy
-from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
-from autocorrect import Speller
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
-import io
-import base64
 import numpy as np
-from matplotlib.figure import Figure
-import statistics
-
-
-# Load the spaCy language model
-nlp = spacy.load('en_core_web_sm')
-# Download the necessary NLTK data if not already downloaded
-nltk.download('punkt')
-nltk.download('stopwords')
-nltk.download('averaged_perceptron_tagger')
-nltk.download('wordnet')
-
-app = Flask(__name__)
-
-# Global variables to store preprocessed documents and sorted terms
-preprocessed_documents = []
-sorted_terms = []
-df_global = None
-
-
-# Function to check if a token is a noun or a proper noun
-def is_noun_or_proper_noun(token):
-    return token.pos_ in {'NOUN', 'PROPN'}
-
-
-# Function to calculate the Outlier Score (OS) and Inverse Document Frequency (IDF)
-def calculate_OS_IDF(collection):
-    document_frequencies = {}
-    inverse_document_frequencies = {}
-
-    # Tokenize documents into terms using spaCy
-    tokenized_documents = [nlp(doc) for doc in collection]
-
-    # Extract all noun and proper noun terms from each document
-    noun_terms_documents = []
-    for doc in tokenized_documents:
-        noun_terms = [token.text for token in doc if is_noun_or_proper_noun(token)]
-        noun_terms_documents.append(noun_terms)
-        unique_terms = set(noun_terms)
-        for term in unique_terms:
-            document_frequencies[term] = document_frequencies.get(term, 0) + 1
-
-    # Total number of documents (each row counts as one document)
-    total_documents = len(collection)
-
-    # Calculate IDF score for each term
-    for term, df in document_frequencies.items():
-        inverse_document_frequencies[term] = round(math.log(total_documents / (1 + df)), 2)
-
-    sorted_terms = sorted(inverse_document_frequencies.items(), key=lambda x: x[1], reverse=True)[:500]
+import os
+import tempfile
+from analysis_store import AnalysisStore
+from histogram import cached_histogram_png, render_histogram_html, score_histogram
+from rarity_stats import RarityStatistics
+from result_cache import content_cache_key, shared_result_cache
+from idf_engine import calculate_idf_array, rank_by_idf
+from corpus import InternedCorpus, Vocabulary, add_document_frequencies
+from ingest import SingleColumnError, hash_stream, iter_text_chunks
+from export import export_term_scores
+from score_writers import ARROW, CSV, JSONL, PARQUET
+from term_index import build_inverted_index, first_posting, highlight_tokens
+from preprocessing import DEFAULT_TAG_BATCH_SIZE, DEFAULT_TAG_PROCESSES, DEFAULT_WORKERS, parallel_lemmatize_documents
+
+blueprint = Blueprint('outlier_word', __name__)
+
+# Cache of analysis results keyed by upload content and options, shared with the document analysis
+result_cache = shared_result_cache()
+
+# Per-session store of analysis results, so concurrent users do not overwrite each other's data
+analysis_store = AnalysisStore()
+
+# File extension of each export format
+EXPORT_EXTENSIONS = {PARQUET: '.parquet', ARROW: '.arrow', CSV: '.csv', JSONL: '.jsonl'}
+
+# Layout of cached analysis results, part of their cache key so results cached by an older layout are not reused
+RESULT_VERSION = 6
+
+
+# Function to calculate the IDF score for each term and keep the rarest terms,
+# ties kept in order of first occurrence
+def rank_terms(vocabulary, document_frequencies, total_documents, max_terms=500):
+    inverse_document_frequencies = calculate_idf_array(document_frequencies, total_documents)
+    ranked_ids = rank_by_idf(inverse_document_frequencies, max_terms)
+    sorted_terms = [(vocabulary.terms[term_id], score) for term_id, score in
+                    zip(ranked_ids.tolist(), inverse_document_frequencies[ranked_ids].tolist())]
 
     return sorted_terms
 
-# Function to preprocess each document
-def preprocess_document(doc):
-    doc = re.sub(r'\[\*\*.*?\*\*\]', ' ', doc)
-    doc = re.sub(r'\b\d+\b', ' ', doc)
-    doc = re.sub(r'[^a-zA-Z0-9\s]', ' ', doc)
-    doc = re.sub(r'\s+', ' ', doc)
-    doc = doc.lower()
-
-    stop_words = set(stopwords.words('english'))
-    spacy_doc = nlp(doc)
-    filtered_tokens = [token.lemma_ for token in spacy_doc if token.text not in stop_words and len(token.text) > 1]
-    doc = ' '.join(filtered_tokens)
 
-    return doc.strip()
-
-
-# Function to correct spelling using autocorrect library
-def autocorrect_spelling(doc):
-    spell = Speller(fast=True)
-    corrected_doc = ' '.join([spell(word) for word in doc.split()])
-    return corrected_doc
+# Function to preprocess and tag all documents with a single spaCy pass per document,
+# split across worker processes when workers > 1
+def preprocess_and_tag_documents(collection, enable_automatic_correction=False, workers=DEFAULT_WORKERS,
+                                 batch_size=DEFAULT_TAG_BATCH_SIZE, n_process=DEFAULT_TAG_PROCESSES):
+    return parallel_lemmatize_documents(collection, enable_automatic_correction, workers=workers,
+                                        batch_size=batch_size, n_process=n_process)
+
+
+# Function to run the word outlier analysis and bin its term rarity scores
+def analyze_words(text_chunks, enable_automatic_correction=False, workers=DEFAULT_WORKERS,
+                  batch_size=DEFAULT_TAG_BATCH_SIZE, n_process=DEFAULT_TAG_PROCESSES):
+    original_documents = []
+    preprocessed_documents = []
+    vocabulary = Vocabulary()
+    document_frequencies = np.zeros(0, dtype=np.int64)
+
+    # Preprocess, tag and count document frequencies chunk by chunk, so noun terms are not kept
+    for chunk in text_chunks:
+        original_documents.extend(chunk.tolist())
+        _, preprocessed_chunk, noun_terms_chunk = preprocess_and_tag_documents(chunk, enable_automatic_correction,
+                                                                               workers, batch_size, n_process)
+        chunk_corpus = InternedCorpus(vocabulary).add_documents(noun_terms_chunk)
+        document_frequencies = add_document_frequencies(document_frequencies, chunk_corpus.document_frequencies())
+        preprocessed_documents.extend(preprocessed_chunk)
+
+    sorted_terms = rank_terms(vocabulary, document_frequencies, len(preprocessed_documents))
+
+    # Index the top terms once, so table updates do not rescan every document
+    term_index = build_inverted_index(preprocessed_documents, [term for term, score in sorted_terms])
+
+    # Bin the term rarity scores; the page draws them and a PNG image is only rendered on request
+    statistics = RarityStatistics().update([score for term, score in sorted_terms])
+    histogram = score_histogram(statistics, 'Word Rarity Score Frequencies', 'Word Rarity Score', y_padding=1)
+
+    return {
+        'original_documents': original_documents,
+        'preprocessed_documents': preprocessed_documents,
+        'sorted_terms': sorted_terms,
+        'term_index': term_index,
+        'histogram': histogram,
+        'vocabulary': vocabulary,
+        'document_frequencies': document_frequencies,
+    }
 
 
-@app.route('/upload', methods=['POST'])
+@blueprint.route('/upload', methods=['POST'])
 def upload_csv():
-    global preprocessed_documents, sorted_terms, df_global  # Include df_global here
     try:
         file = request.files['file']
         if not file:
@@ -100,60 +96,28 @@ def upload_csv():
         if not file.filename.endswith('.csv'):
             return render_template_string("<h2>Please upload a CSV file</h2>")
 
-        df = pd.read_csv(file)
-        df_global = df  # Set the global DataFrame
-
-        if len(df.columns) != 1:
-            return render_template_string("<h2>Please provide only a one-column dataset</h2>")
-
         enable_automatic_correction = request.form.get('enable_automatic_correction') == '1'
 
-        df['preprocessed'] = df.iloc[:, 0].apply(preprocess_document)
-        preprocessed_documents = df['preprocessed'].tolist()
-
-        if enable_automatic_correction:
-            preprocessed_documents = [autocorrect_spelling(doc) for doc in preprocessed_documents]
-
-        sorted_terms = calculate_OS_IDF(preprocessed_documents)
-
-        # Inside the /upload route after calculating the sorted_terms and idf_scores
-        idf_scores = [score for term, score in sorted_terms]
-        mean_score = np.mean(idf_scores)
-        median_score = np.median(idf_scores)
-        std_dev_score = np.std(idf_scores)  # Use numpy's std function for standard deviation
-
-        fig = Figure()
-        ax = fig.subplots()
-        counts, bins, patches = ax.hist(idf_scores, bins='auto', color='green', alpha=0.7, edgecolor='black')
+        # Reuse the previous analysis when the same file is uploaded with the same options
+        cache_key = content_cache_key(hash_stream(file.stream), analysis='word', version=RESULT_VERSION,
+                                      autocorrect=enable_automatic_correction)
+        result = result_cache.get(cache_key)
 
-        # Plot mean, median, and standard deviation lines
-        ax.axvline(mean_score, color='blue', linestyle='-', linewidth=2, label=f'Mean: {mean_score:.2f}')
-        ax.axvline(median_score, color='orange', linestyle='--', linewidth=2, label=f'Median: {median_score:.2f}')
-        ax.axvline(mean_score + std_dev_score, color='yellow', linestyle='--', linewidth=2,
-                   label=f'Standard Deviation: {std_dev_score:.2f}')
-        ax.axvline(mean_score - std_dev_score, color='yellow', linestyle='--', linewidth=2)
+        if result is None:
+            # Read the CSV file in chunks, checking for a single column
+            try:
+                result = analyze_words(iter_text_chunks(file.stream), enable_automatic_correction)
+            except SingleColumnError:
+                return render_template_string("<h2>Please provide only a one-column dataset</h2>")
+            result_cache.put(cache_key, result)
 
-        # Set axis limits to ensure the mean lines are visible
-        ax.set_xlim([min(idf_scores) - 1, max(idf_scores) + 1])
-        ax.set_ylim([0, max(counts) + 1])
-
-        ax.set_title('Word Rarity Score Frequencies')
-        ax.set_xlabel('Word Rarity Score')
-        ax.set_ylabel('Frequency')
-        ax.legend()
-
-        # Convert the plot to a PNG image and then to a base64 string
-        buf = io.BytesIO()
-        fig.savefig(buf, format='png')
-        buf.seek(0)
-        histogram_png = base64.b64encode(buf.getvalue()).decode('utf-8')
-        buf.close()
-
-        # Add histogram image to the HTML
-        histogram_html = f'<div style="text-align: center;"><img src="data:image/png;base64,{histogram_png}" alt="Rarity Score Frequencies Histogram"></div>'
+        # Keep the result for this session's table updates
+        result_id = analysis_store.add(result)
+        histogram_html = render_histogram_html(result['histogram'],
+                                               url_for('outlier_word.histogram_png', result_id=result_id))
 
         # Precompute the initial 50 terms
-        initial_output_html = generate_table_html(50, df)
+        initial_output_html = generate_table_html(50, result)
 
         return render_template_string("""
             <!DOCTYPE html>
@@ -274,9 +238,9 @@ def upload_csv():
 
             function updateTable(num_terms) {
                 $.ajax({
-                    url: "/update_table",
+                    url: "{{ url_for('outlier_word.update_table') }}",
                     method: "POST",
-                    data: { num_terms: num_terms },
+                    data: { num_terms: num_terms, result_id: "{{ result_id }}" },
                     success: function(data) {
                         $("#output_table").html(data);
                     }
@@ -293,8 +257,9 @@ def upload_csv():
             <input type="range" class="form-control-range" id="num_terms" name="num_terms" min="1" max="500" value="50">
         </div>
         
+            {{ histogram_html|safe }}
+            <div class="text-center"><a href="{{ url_for('outlier_word.export_results', result_id=result_id) }}">Export term IDF (Parquet)</a></div>
             <div class="table-container" id="output_table">
-             {{ histogram_html|safe }}
                 {{ table | safe }}
         </div>
 
@@ -302,21 +267,68 @@ def upload_csv():
 </body>
 </html>
 
-       """, table=initial_output_html, histogram_html=histogram_html)
+       """, table=initial_output_html, histogram_html=histogram_html, result_id=result_id)
 
     except Exception as e:
         return render_template_string(f"<h2>An error occurred: {str(e)}</h2>")
 
 
-@app.route('/update_table', methods=['POST'])
+@blueprint.route('/update_table', methods=['POST'])
 def update_table():
     num_terms = int(request.form['num_terms'])
-    output_html = generate_table_html(num_terms, df_global)
+    result = analysis_store.get(request.form.get('result_id', ''))
+    if result is None:
+        return jsonify("<h2>This analysis has expired, please upload the CSV file again</h2>")
+    output_html = generate_table_html(num_terms, result)
     return jsonify(output_html)
 
 
+# Route to download the histogram of an analysis' term rarity scores as a PNG image, rendered once per analysis
+@blueprint.route('/results/<result_id>/histogram.png', methods=['GET'])
+def histogram_png(result_id):
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+    return Response(cached_histogram_png(result), mimetype='image/png')
+
+
+# Route to export the document frequency and IDF of every term of an analysis, rarest first,
+# as a Parquet (default), Arrow, CSV or JSONL file written a block of rows at a time
+@blueprint.route('/results/<result_id>/export', methods=['GET'])
+def export_results(result_id):
+    result = analysis_store.get(result_id)
+    if result is None:
+        return jsonify({'error': 'This analysis has expired, please upload the CSV file again'}), 404
+
+    output_format = request.args.get('format', PARQUET)
+    if output_format not in EXPORT_EXTENSIONS:
+        return jsonify({'error': 'Unknown format'}), 400
+
+    document_frequencies = result['document_frequencies']
+    inverse_document_frequencies = calculate_idf_array(document_frequencies, len(result['original_documents']))
+
+    fd, path = tempfile.mkstemp(prefix='medinym-export-', suffix=EXPORT_EXTENSIONS[output_format])
+    os.close(fd)
+    try:
+        export_term_scores(result['vocabulary'].terms, document_frequencies, inverse_document_frequencies, path,
+                           output_format)
+        export_file = open(path, 'rb')
+    except ImportError as e:
+        return jsonify({'error': str(e)}), 501
+    finally:
+        # The open file keeps the data readable until it has been sent
+        os.remove(path)
+
+    return send_file(export_file, as_attachment=True,
+                     download_name=f'terms-{result_id}{EXPORT_EXTENSIONS[output_format]}')
+
+
+def generate_table_html(num_terms, result):
+    original_documents = result['original_documents']
+    preprocessed_documents = result['preprocessed_documents']
+    sorted_terms = result['sorted_terms']
+    term_index = result['term_index']
 
-def generate_table_html(num_terms, df):
     output_data = {
         'Index': [],
         'Original Text': [],
@@ -326,13 +338,12 @@ def generate_table_html(num_terms, df):
     }
     for i in range(min(num_terms, len(sorted_terms))):
         term, rarity_score = sorted_terms[i]
-        term_indices = [index for index, doc in enumerate(preprocessed_documents) if re.search(r'\b{}\b'.format(re.escape(term)), doc)]
-        if term_indices:
-            term_index = term_indices[0]
-            original_text = preprocessed_documents[term_index]
-            highlighted_text = re.sub(r'(\b{}\b)'.format(re.escape(term)), r'<span class="highlight">\1</span>', original_text)
-            output_data['Index'].append(term_index + 1)
-            output_data['Original Text'].append(df.iloc[term_index, 0])
+        posting = first_posting(term_index, term)
+        if posting:
+            doc_id, offsets = posting
+            highlighted_text = highlight_tokens(preprocessed_documents[doc_id], offsets)
+            output_data['Index'].append(doc_id + 1)
+            output_data['Original Text'].append(original_documents[doc_id])
             output_data['Preprocessed Text'].append(highlighted_text)
             output_data['Term'].append(term)
             output_data['Term Rarity score'].append(rarity_score)
@@ -348,7 +359,7 @@ def generate_table_html(num_terms, df):
 
 
 
-@app.route('/')
+@blueprint.route('/')
 def index():
     return render_template_string("""
         <!DOCTYPE html>
@@ -381,7 +392,7 @@ def index():
                 <h4 class="card-title">Upload CSV</h4>
             </div>
             <div class="card-body">
-                <form method="post" action="/upload" enctype="multipart/form-data" id="uploadForm">
+                <form method="post" action="{{ url_for('outlier_word.upload_csv') }}" enctype="multipart/form-data" id="uploadForm">
                     <div class="form-group">
                         <input type="file" name="file" class="form-control-file" id="fileInput">
                     </div>
@@ -437,4 +448,6 @@ def index():
     """)
 
 if __name__ == '__main__':
+    app = Flask(__name__)
+    app.register_blueprint(blueprint)
     app.run(port=8088, debug=True)
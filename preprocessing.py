@@ -0,0 +1,138 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from normalizer import english_stop_words, normalize_documents, preprocess_documents
+from speller import correct_documents, correct_word, get_speller
+from tagging import (DEFAULT_BATCH_SIZE, iter_lemmatized_documents, iter_noun_terms, iter_noun_terms_with_offsets,
+                     load_nlp)
+
+# Number of worker processes used for preprocessing (1 keeps everything in the calling process)
+DEFAULT_WORKERS = int(os.environ.get('MEDINYM_WORKERS', '1'))
+
+# Number of documents spaCy tags at once, and the number of processes it tags them with
+DEFAULT_TAG_BATCH_SIZE = int(os.environ.get('MEDINYM_TAG_BATCH_SIZE', str(DEFAULT_BATCH_SIZE)))
+DEFAULT_TAG_PROCESSES = int(os.environ.get('MEDINYM_TAG_PROCESSES', '1'))
+
+# Number of documents sent to a worker process at once
+DEFAULT_CHUNK_SIZE = 1000
+
+# How worker processes are started: never forked from the threaded server, whose locks a fork could copy held
+START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+# Function to load the spaCy language model once per process
+@lru_cache(maxsize=None)
+def get_nlp():
+    return load_nlp()
+
+
+# Function to load the spaCy model, stop words and speller up front, e.g. once per pre-forked server worker,
+# so the first request does not pay for them
+def warm_up(enable_automatic_correction=False):
+    get_nlp()
+    english_stop_words()
+    if enable_automatic_correction:
+        get_speller()
+
+
+# Function to get a persistent pool of worker processes, so models stay loaded between uploads
+@lru_cache(maxsize=None)
+def get_executor(workers):
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(START_METHOD))
+
+
+# Function to preprocess a chunk of documents: normalize, drop stop words and optionally autocorrect
+def preprocess_chunk(documents, enable_automatic_correction=False):
+    preprocessed_documents = preprocess_documents(documents)
+    if enable_automatic_correction:
+        preprocessed_documents = correct_documents(preprocessed_documents)
+    return preprocessed_documents
+
+
+# Function to normalize, lemmatize and POS tag a chunk of documents with a single spaCy pass per document,
+# optionally autocorrecting the lemmas
+def lemmatize_chunk(documents, enable_automatic_correction=False, batch_size=DEFAULT_TAG_BATCH_SIZE,
+                    n_process=DEFAULT_TAG_PROCESSES):
+    stop_words = english_stop_words()
+    normalized_documents = normalize_documents(documents)
+
+    lemmatized_documents = []
+    corrected_documents = []
+    noun_terms_documents = []
+    for lemmas, noun_terms in iter_lemmatized_documents(get_nlp(), normalized_documents, stop_words,
+                                                        batch_size=batch_size, n_process=n_process):
+        lemmatized_documents.append(' '.join(lemmas).strip())
+        if enable_automatic_correction:
+            # Correct each distinct lemma once and apply it to both the text and the noun terms
+            corrections = {lemma: correct_word(lemma) for lemma in set(lemmas)}
+            lemmas = [corrections[lemma] for lemma in lemmas]
+            noun_terms = [corrections[term] for term in noun_terms]
+        corrected_documents.append(' '.join(lemmas).strip())
+        noun_terms_documents.append(noun_terms)
+
+    return lemmatized_documents, corrected_documents, noun_terms_documents
+
+
+# Function to run a chunk function over the documents, in worker processes when workers > 1,
+# returning the per-chunk results in the original order
+def map_chunks(func, documents, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE, **kwargs):
+    documents = list(documents)
+    if workers <= 1 or len(documents) <= chunk_size:
+        return [func(documents, **kwargs)]
+
+    chunks = [documents[i:i + chunk_size] for i in range(0, len(documents), chunk_size)]
+    futures = [get_executor(workers).submit(func, chunk, **kwargs) for chunk in chunks]
+    return [future.result() for future in futures]
+
+
+# Function to preprocess documents across worker processes; the output matches preprocess_chunk exactly
+def parallel_preprocess_documents(documents, enable_automatic_correction=False, workers=DEFAULT_WORKERS,
+                                  chunk_size=DEFAULT_CHUNK_SIZE):
+    results = map_chunks(preprocess_chunk, documents, workers, chunk_size,
+                         enable_automatic_correction=enable_automatic_correction)
+    return [doc for chunk in results for doc in chunk]
+
+
+# Function to lemmatize and tag documents across worker processes; the output matches lemmatize_chunk exactly
+def parallel_lemmatize_documents(documents, enable_automatic_correction=False, workers=DEFAULT_WORKERS,
+                                 chunk_size=DEFAULT_CHUNK_SIZE, batch_size=DEFAULT_TAG_BATCH_SIZE,
+                                 n_process=DEFAULT_TAG_PROCESSES):
+    results = map_chunks(lemmatize_chunk, documents, workers, chunk_size,
+                         enable_automatic_correction=enable_automatic_correction, batch_size=batch_size,
+                         n_process=n_process)
+    lemmatized_documents = []
+    corrected_documents = []
+    noun_terms_documents = []
+    for lemmatized_chunk, corrected_chunk, noun_terms_chunk in results:
+        lemmatized_documents.extend(lemmatized_chunk)
+        corrected_documents.extend(corrected_chunk)
+        noun_terms_documents.extend(noun_terms_chunk)
+    return lemmatized_documents, corrected_documents, noun_terms_documents
+
+
+# Function to preprocess, optionally autocorrect and tag one chunk of documents with the noun and
+# proper noun terms of each document
+def preprocess_and_tag_chunk(chunk, enable_automatic_correction=False, workers=DEFAULT_WORKERS,
+                             batch_size=DEFAULT_TAG_BATCH_SIZE, n_process=DEFAULT_TAG_PROCESSES):
+    # Apply preprocessing and optional autocorrection, across worker processes when workers > 1
+    preprocessed_chunk = parallel_preprocess_documents(chunk, enable_automatic_correction, workers=workers)
+
+    noun_terms_chunk = list(iter_noun_terms(get_nlp(), preprocessed_chunk, batch_size=batch_size,
+                                            n_process=n_process))
+    return preprocessed_chunk, noun_terms_chunk
+
+
+# Function to preprocess, optionally autocorrect and tag one chunk of documents, also returning the
+# character offset of each noun term in its preprocessed document, for highlighting
+def preprocess_and_tag_chunk_with_offsets(chunk, enable_automatic_correction=False, workers=DEFAULT_WORKERS,
+                                          batch_size=DEFAULT_TAG_BATCH_SIZE, n_process=DEFAULT_TAG_PROCESSES):
+    preprocessed_chunk = parallel_preprocess_documents(chunk, enable_automatic_correction, workers=workers)
+
+    noun_terms_chunk = []
+    term_offsets_chunk = []
+    for noun_terms, term_offsets in iter_noun_terms_with_offsets(get_nlp(), preprocessed_chunk, batch_size=batch_size,
+                                                                 n_process=n_process):
+        noun_terms_chunk.append(noun_terms)
+        term_offsets_chunk.append(term_offsets)
+    return preprocessed_chunk, noun_terms_chunk, term_offsets_chunk
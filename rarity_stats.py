@@ -0,0 +1,151 @@
+import math
+from bisect import bisect_right
+import numpy as np
+
+# Width of the fixed histogram bins, in rarity score units, and the most bins a summary histogram is drawn with
+DEFAULT_BIN_WIDTH = 0.05
+MAX_HISTOGRAM_BINS = 60
+
+# Number of values a quantile is computed exactly from before it is estimated from five markers
+EXACT_QUANTILE_VALUES = 1000
+
+
+# P² estimate of one quantile of a stream (Jain and Chlamtac), kept in five markers whatever the stream's length;
+# the markers start from the exact quantiles of the first values, which are kept until there are enough of them
+class P2Quantile:
+    def __init__(self, p=0.5, exact_values=EXACT_QUANTILE_VALUES):
+        self.p = p
+        self.exact_values = max(exact_values, 5)
+        self.values = []
+        self.heights = None
+        self.increments = [0, p / 2, p, (1 + p) / 2, 1]
+
+    def _start_markers(self):
+        values = sorted(self.values)
+        last = len(values) - 1
+        self.desired = [last * increment for increment in self.increments]
+        self.positions = [round(desired) for desired in self.desired]
+        self.heights = [values[position] for position in self.positions]
+        self.values = None
+
+    def add(self, value):
+        if self.heights is None:
+            self.values.append(value)
+            if len(self.values) > self.exact_values:
+                self._start_markers()
+            return
+
+        heights = self.heights
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect_right(heights, value) - 1
+
+        positions = self.positions
+        for i in range(cell + 1, 5):
+            positions[i] += 1
+        for i in range(5):
+            self.desired[i] += self.increments[i]
+
+        # Move the middle markers towards their desired positions, parabolically if that keeps them ordered
+        for i in (1, 2, 3):
+            offset = self.desired[i] - positions[i]
+            if (offset >= 1 and positions[i + 1] - positions[i] > 1) or \
+                    (offset <= -1 and positions[i - 1] - positions[i] < -1):
+                step = 1 if offset > 0 else -1
+                height = self._parabolic(i, step)
+                if not heights[i - 1] < height < heights[i + 1]:
+                    height = heights[i] + step * (heights[i + step] - heights[i]) / (positions[i + step] - positions[i])
+                heights[i] = height
+                positions[i] += step
+
+    def _parabolic(self, i, step):
+        heights, positions = self.heights, self.positions
+        return heights[i] + step / (positions[i + 1] - positions[i - 1]) * (
+            (positions[i] - positions[i - 1] + step) * (heights[i + 1] - heights[i]) / (positions[i + 1] - positions[i])
+            + (positions[i + 1] - positions[i] - step) * (heights[i] - heights[i - 1]) / (positions[i] - positions[i - 1]))
+
+    def value(self):
+        if self.heights is None:
+            return float(np.quantile(self.values, self.p)) if self.values else 0.0
+        return self.heights[2]
+
+
+# One-pass summary of a stream of rarity scores: count, mean and variance (Welford, merged a chunk at a time),
+# an approximate median and a histogram of fixed-width bins, in memory independent of the number of scores
+class RarityStatistics:
+    def __init__(self, bin_width=DEFAULT_BIN_WIDTH):
+        self.bin_width = bin_width
+        self.count = 0
+        self.mean = 0.0
+        self._squared_deviations = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self._median = P2Quantile(0.5)
+        self._first_bin = 0
+        self._bin_counts = np.zeros(0, dtype=np.int64)
+
+    def update(self, scores):
+        scores = np.asarray(scores, dtype=np.float64)
+        if not len(scores):
+            return self
+
+        # Combine the chunk's mean and squared deviations with the running ones (Chan et al.)
+        chunk_count = len(scores)
+        chunk_mean = float(scores.mean())
+        chunk_squared_deviations = float(np.square(scores - chunk_mean).sum())
+        total = self.count + chunk_count
+        delta = chunk_mean - self.mean
+        self.mean += delta * chunk_count / total
+        self._squared_deviations += chunk_squared_deviations + delta * delta * self.count * chunk_count / total
+        self.count = total
+        self.minimum = min(self.minimum, float(scores.min()))
+        self.maximum = max(self.maximum, float(scores.max()))
+
+        for score in scores.tolist():
+            self._median.add(score)
+
+        # Count the chunk into bins of fixed width, growing the bin range to cover it; scores on a bin edge
+        # (0.7 / 0.05 is 13.999...) are counted in the bin they start
+        bins = np.floor(np.round(scores / self.bin_width, 6)).astype(np.int64)
+        first_bin = int(bins.min()) if not len(self._bin_counts) else min(self._first_bin, int(bins.min()))
+        last_bin = max(self._first_bin + len(self._bin_counts) - 1, int(bins.max()))
+        bin_counts = np.zeros(last_bin - first_bin + 1, dtype=np.int64)
+        if len(self._bin_counts):
+            start = self._first_bin - first_bin
+            bin_counts[start:start + len(self._bin_counts)] = self._bin_counts
+        bin_counts += np.bincount(bins - first_bin, minlength=len(bin_counts))
+        self._first_bin, self._bin_counts = first_bin, bin_counts
+        return self
+
+    # Population variance and standard deviation, as np.var and np.std
+    @property
+    def variance(self):
+        return self._squared_deviations / self.count if self.count else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def median(self):
+        return self._median.value()
+
+    # Bin counts and edges of the scores so far, adjacent fixed bins merged to draw at most max_bins
+    def histogram(self, max_bins=MAX_HISTOGRAM_BINS):
+        if not self.count:
+            return [], []
+        merge = -(-len(self._bin_counts) // max_bins)
+        padded = np.zeros(-(-len(self._bin_counts) // merge) * merge, dtype=np.int64)
+        padded[:len(self._bin_counts)] = self._bin_counts
+        counts = padded.reshape(-1, merge).sum(axis=1)
+        edges = np.round((self._first_bin + np.arange(len(counts) + 1) * merge) * self.bin_width, 10)
+        return counts.tolist(), edges.tolist()
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'median': self.median, 'std': self.std,
+                'min': self.minimum if self.count else 0.0, 'max': self.maximum if self.count else 0.0}
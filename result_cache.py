@@ -0,0 +1,189 @@
+import hashlib
+import os
+import pickle
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from functools import lru_cache
+import numpy as np
+
+# Default bounds for the in-memory tier
+DEFAULT_MAX_ENTRIES = 16
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+# Function to build a cache key from the hash of the uploaded file content and the processing options
+def content_cache_key(content_hash, **options):
+    digest = hashlib.sha256(content_hash.encode('utf-8'))
+    for name in sorted(options):
+        digest.update(f'\0{name}={options[name]!r}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+# Number of items of a large container whose sizes are measured to estimate the size of all of them
+SIZE_SAMPLE = 64
+
+
+# Function to estimate the memory held by a value without serializing it: NumPy and array buffers by their
+# size in bytes, other objects by sys.getsizeof, walking containers and object attributes once each;
+# the items of large containers are estimated from an even sample of them
+def estimate_size(value):
+    seen = set()
+    pending = [(value, 1.0)]
+    size = 0.0
+    while pending:
+        item, weight = pending.pop()
+        if id(item) in seen:
+            continue
+        seen.add(id(item))
+        if isinstance(item, np.ndarray):
+            size += weight * item.nbytes
+            continue
+        if isinstance(item, array):
+            size += weight * item.itemsize * len(item)
+            continue
+
+        size += weight * sys.getsizeof(item)
+        if isinstance(item, dict):
+            pairs = list(item.items())
+            pairs = pairs if len(pairs) <= SIZE_SAMPLE else pairs[::len(pairs) // SIZE_SAMPLE]
+            children = [child for pair in pairs for child in pair]
+            length = 2 * len(item)
+        elif isinstance(item, (list, tuple, set, frozenset)):
+            items = item if isinstance(item, (list, tuple)) else list(item)
+            children = items if len(items) <= SIZE_SAMPLE else items[::len(items) // SIZE_SAMPLE]
+            length = len(items)
+        elif hasattr(item, '__dict__') and not isinstance(item, type):
+            children = [vars(item)]
+            length = 1
+        else:
+            continue
+        if children:
+            child_weight = weight * length / len(children)
+            pending.extend((child, child_weight) for child in children)
+    return int(size)
+
+
+# LRU cache of analysis results, bounded by entry count and estimated size, with an optional on-disk tier
+# bounded the same way by the size of its files
+class ResultCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, max_bytes=DEFAULT_MAX_BYTES, disk_dir=None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+        self._disk_entries = OrderedDict()
+        self._disk_bytes = 0
+        self._disk_lock = threading.Lock()
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._load_disk_entries()
+
+    def _disk_path(self, key):
+        return os.path.join(self.disk_dir, f'{key}.pkl')
+
+    # Index the files left by earlier runs, least recently used first by modification time, and trim them
+    # to the budget
+    def _load_disk_entries(self):
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.is_file() and entry.name.endswith('.pkl'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, entry.name[:-len('.pkl')], stat.st_size))
+        with self._disk_lock:
+            for _, key, size in sorted(files):
+                self._disk_entries[key] = size
+                self._disk_bytes += size
+            self._evict_disk_entries()
+
+    # Remove the least recently used files until the disk tier is back within its bounds
+    def _evict_disk_entries(self):
+        while len(self._disk_entries) > self.max_entries or self._disk_bytes > self.max_bytes:
+            key, size = self._disk_entries.popitem(last=False)
+            self._disk_bytes -= size
+            try:
+                os.remove(self._disk_path(key))
+            except FileNotFoundError:
+                pass
+
+    def _write_disk_entry(self, key, payload):
+        # A result larger than the whole disk budget is not written at all
+        if len(payload) > self.max_bytes:
+            return
+        # Write to a temporary file first so readers never see a partial entry
+        path = self._disk_path(key)
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            f.write(payload)
+        with self._disk_lock:
+            os.replace(tmp_path, path)
+            self._disk_bytes -= self._disk_entries.pop(key, 0)
+            self._disk_entries[key] = len(payload)
+            self._disk_bytes += len(payload)
+            self._evict_disk_entries()
+
+    # Mark a file as just used, also in its modification time so the order survives a restart
+    def _touch_disk_entry(self, key):
+        with self._disk_lock:
+            if key in self._disk_entries:
+                self._disk_entries.move_to_end(key)
+        try:
+            os.utime(self._disk_path(key))
+        except FileNotFoundError:
+            pass
+
+    def _store(self, key, value, size):
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            # A result larger than the whole memory budget is not kept in memory
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size)
+            self._total_bytes += size
+            while len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None:
+            if self.disk_dir:
+                self._touch_disk_entry(key)
+            return entry[0]
+
+        if not self.disk_dir:
+            return None
+        try:
+            with open(self._disk_path(key), 'rb') as f:
+                payload = f.read()
+        except FileNotFoundError:
+            return None
+        value = pickle.loads(payload)
+        self._touch_disk_entry(key)
+        self._store(key, value, estimate_size(value))
+        return value
+
+    def put(self, key, value):
+        # Results are only serialized for the disk tier; the memory tier estimates their size in place
+        if self.disk_dir:
+            self._write_disk_entry(key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        self._store(key, value, estimate_size(value))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
+
+
+# Function to get the process-wide result cache shared by the analyses
+# (set MEDINYM_CACHE_DIR to also keep results on disk)
+@lru_cache(maxsize=None)
+def shared_result_cache():
+    return ResultCache(disk_dir=os.environ.get('MEDINYM_CACHE_DIR'))
@@ -3,12 +3,11 @@
 # Exit immediately if a command exits with a non-zero status.
 set -e
 
-# Run the first Python script
-python outlier_word.py
-
-echo "## outlier_word.py is running.. ##"
-
-# Run the second Python script
-python outlier_doc.py
-
-echo "## outlier_doc.py is running.. ##"
+# Serve both analyses from one process: the document analysis under /doc and the word analysis under /word.
+# Analyses and their result pages live in the process' memory, so a single worker process serves every
+# request on a pool of threads; set MEDINYM_WORKERS to spread preprocessing over more CPU cores, and
+# MEDINYM_TAG_BATCH_SIZE / MEDINYM_TAG_PROCESSES to tune the batch size and processes of spaCy tagging.
+echo "## Serving outlier_doc.py and outlier_word.py on port ${PORT:-8084} ##"
+
+exec gunicorn --worker-class gthread --workers 1 --threads "${MEDINYM_THREADS:-8}" \
+    --timeout 0 --bind "0.0.0.0:${PORT:-8084}" wsgi:app
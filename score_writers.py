@@ -0,0 +1,132 @@
+import csv
+import json
+import os
+
+# Output formats, chosen from the file extension unless given explicitly
+CSV = 'csv'
+JSONL = 'jsonl'
+PARQUET = 'parquet'
+ARROW = 'arrow'
+FORMAT_EXTENSIONS = {'.csv': CSV, '.jsonl': JSONL, '.ndjson': JSONL, '.parquet': PARQUET, '.arrow': ARROW,
+                     '.feather': ARROW}
+
+# Columns and value types of the per-document and per-term score outputs
+DOCUMENT_SCORE_COLUMNS = {
+    'Index': 'int64',
+    'Rarity Score': 'float64',
+    'Rarest Terms': 'list<string>',
+    'Term Rarity Score': 'list<float64>',
+}
+TERM_SCORE_COLUMNS = {
+    'Term': 'string',
+    'Document Frequency': 'int64',
+    'Term Rarity Score': 'float64',
+}
+
+
+# Function to find the output format of a path from its extension
+def output_format_for(path, output_format=None):
+    if output_format is None:
+        output_format = FORMAT_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if output_format not in (CSV, JSONL, PARQUET, ARROW):
+        raise ValueError(f"Unknown output format for {path}; use one of {', '.join(sorted(FORMAT_EXTENSIONS))}")
+    return output_format
+
+
+# Function to format one value for a CSV cell: scores with 2 decimals, lists joined by commas
+def format_csv_value(value):
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    if isinstance(value, list):
+        return ', '.join(format_csv_value(item) for item in value)
+    return value
+
+
+# Writer of score blocks (dicts of equally long column lists) as CSV rows
+class CsvScoreWriter:
+    def __init__(self, path, columns):
+        self.columns = list(columns)
+        self._file = open(path, 'w', newline='', encoding='utf-8')
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write(self, block):
+        for row in zip(*(block[column] for column in self.columns)):
+            self._writer.writerow([format_csv_value(value) for value in row])
+
+    def close(self):
+        self._file.close()
+
+
+# Writer of score blocks as JSON lines, one object per row
+class JsonlScoreWriter:
+    def __init__(self, path, columns):
+        self.columns = list(columns)
+        self._file = open(path, 'w', encoding='utf-8')
+
+    def write(self, block):
+        for row in zip(*(block[column] for column in self.columns)):
+            self._file.write(json.dumps(dict(zip(self.columns, row)), ensure_ascii=False))
+            self._file.write('\n')
+
+    def close(self):
+        self._file.close()
+
+
+# Writer of score blocks as a Parquet file, one row group per block (requires pyarrow)
+class ParquetScoreWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("Writing Parquet files requires pyarrow (pip install pyarrow)") from None
+
+        self._pa = pa
+        self.schema = arrow_schema(pa, columns)
+        self._writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, block):
+        self._writer.write_table(self._pa.Table.from_pydict(block, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+# Writer of score blocks as an Arrow IPC (Feather version 2) file, one record batch per block (requires pyarrow)
+class ArrowScoreWriter:
+    def __init__(self, path, columns):
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("Writing Arrow files requires pyarrow (pip install pyarrow)") from None
+
+        self._pa = pa
+        self.schema = arrow_schema(pa, columns)
+        self._writer = pa.ipc.new_file(path, self.schema)
+
+    def write(self, block):
+        self._writer.write_table(self._pa.Table.from_pydict(block, schema=self.schema))
+
+    def close(self):
+        self._writer.close()
+
+
+# Function to map a column value type to its Arrow type
+def arrow_type(pa, value_type):
+    if value_type.startswith('list<'):
+        return pa.list_(arrow_type(pa, value_type[len('list<'):-1]))
+    return {'int64': pa.int64(), 'float64': pa.float64(), 'string': pa.string()}[value_type]
+
+
+# Function to build the Arrow schema of a set of score columns
+def arrow_schema(pa, columns):
+    return pa.schema([(column, arrow_type(pa, value_type)) for column, value_type in columns.items()])
+
+
+WRITERS = {CSV: CsvScoreWriter, JSONL: JsonlScoreWriter, PARQUET: ParquetScoreWriter, ARROW: ArrowScoreWriter}
+
+
+# Function to open a streaming writer of score blocks for a path, in the format of its extension
+def open_score_writer(path, columns, output_format=None):
+    return WRITERS[output_format_for(path, output_format)](path, columns)
@@ -0,0 +1,46 @@
+import os
+from flask import Flask, render_template_string
+import outlier_doc
+import outlier_word
+from preprocessing import warm_up
+
+INDEX_TEMPLATE = """
+    <!DOCTYPE html>
+    <html lang="en">
+    <head>
+        <meta charset="UTF-8">
+        <meta name="viewport" content="width=device-width, initial-scale=1.0">
+        <title>MEDINYM Outlier Analysis</title>
+        <link rel="stylesheet" href="https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/css/bootstrap.min.css">
+    </head>
+    <body>
+        <div class="container mt-5 text-center">
+            <h1 class="mb-4">Outlier Analysis</h1>
+            <a class="btn btn-primary btn-lg m-2" href="{{ url_for('outlier_doc.index') }}">Find Outlier Documents</a>
+            <a class="btn btn-success btn-lg m-2" href="{{ url_for('outlier_word.index') }}">Find Outlier Words</a>
+        </div>
+    </body>
+    </html>
+"""
+
+
+# Function to create the combined application: both analyses mounted as blueprints in one process,
+# sharing one spaCy model, one speller and one result cache
+def create_app(preload_models=False):
+    app = Flask(__name__)
+    app.register_blueprint(outlier_doc.blueprint, url_prefix='/doc')
+    app.register_blueprint(outlier_word.blueprint, url_prefix='/word')
+
+    @app.route('/')
+    def index():
+        return render_template_string(INDEX_TEMPLATE)
+
+    # Load the models before serving, e.g. in the server master before it forks its workers
+    if preload_models:
+        warm_up(os.environ.get('MEDINYM_PRELOAD_SPELLER') == '1')
+
+    return app
+
+
+if __name__ == '__main__':
+    create_app().run(port=int(os.environ.get('PORT', 8084)), debug=True)
@@ -0,0 +1,27 @@
+from functools import lru_cache
+from autocorrect import Speller
+
+# Maximum number of distinct words whose correction is remembered per process
+DEFAULT_MEMO_SIZE = 200000
+
+
+# Function to get the process-wide speller, so its word-frequency dictionary is loaded once
+@lru_cache(maxsize=None)
+def get_speller():
+    return Speller(fast=True)
+
+
+# Function to correct the spelling of a single whitespace-free token, memoized per process
+@lru_cache(maxsize=DEFAULT_MEMO_SIZE)
+def correct_word(word):
+    return get_speller()(word)
+
+
+# Function to correct a list of documents, spell-checking each distinct token only once;
+# chunks are spread across processes by the persistent pool in preprocessing
+def correct_documents(documents):
+    tokenized_documents = [doc.split() for doc in documents]
+    unique_words = {word for tokens in tokenized_documents for word in tokens}
+
+    corrections = {word: correct_word(word) for word in unique_words}
+    return [' '.join(corrections[word] for word in tokens) for tokens in tokenized_documents]
@@ -0,0 +1,44 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+# Application modules whose import time is measured
+MODULES = ['outlier_doc', 'outlier_word', 'app', 'example']
+
+# Code run in a fresh interpreter: time the import, then the first model load
+PROBE = '''
+import json, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+if {warm_up}:
+    import preprocessing
+    preprocessing.warm_up()
+print(json.dumps({{'import': imported - start, 'warm_up': time.perf_counter() - imported}}))
+'''
+
+
+# Function to time the startup of one module in a fresh interpreter, as a pre-forked worker would see it
+def measure(module, warm_up=False):
+    output = subprocess.run([sys.executable, '-c', PROBE.format(module=module, warm_up=warm_up)],
+                            check=True, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Measure the startup time of the application modules')
+    parser.add_argument('modules', nargs='*', default=MODULES, help='modules to import')
+    parser.add_argument('--repeat', type=int, default=5, help='fresh interpreters started per module')
+    parser.add_argument('--warm-up', action='store_true', help='also time loading the spaCy model and stop words')
+    args = parser.parse_args()
+
+    print(f"{'module':<15}{'import (s)':>12}{'warm-up (s)':>13}")
+    for module in args.modules:
+        timings = [measure(module, args.warm_up) for _ in range(args.repeat)]
+        import_time = statistics.median(timing['import'] for timing in timings)
+        warm_up_time = statistics.median(timing['warm_up'] for timing in timings)
+        print(f"{module:<15}{import_time:>12.3f}{warm_up_time:>13.3f}")
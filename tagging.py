@@ -0,0 +1,57 @@
+# Pipeline components that are not needed when only POS tags are required
+POS_ONLY_DISABLED_PIPES = ['parser', 'ner', 'lemmatizer']
+
+# Default number of documents sent through the spaCy pipeline at once
+DEFAULT_BATCH_SIZE = 1000
+
+
+# Function to load the spaCy language model; spaCy itself is imported here, so importing
+# this module stays cheap until a model is actually needed
+def load_nlp(model='en_core_web_sm'):
+    import spacy
+    return spacy.load(model)
+
+
+# Function to check if a token is a noun or a proper noun
+def is_noun_or_proper_noun(token):
+    return token.pos_ in {'NOUN', 'PROPN'}
+
+
+# Function to list the pipeline components that can be skipped for POS tagging
+def pos_only_disabled_pipes(nlp):
+    return [name for name in POS_ONLY_DISABLED_PIPES if name in nlp.pipe_names]
+
+
+# Function to stream documents through spaCy in batches, tagging POS only
+def iter_tagged_documents(nlp, collection, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    return nlp.pipe(collection, batch_size=batch_size, n_process=n_process,
+                    disable=pos_only_disabled_pipes(nlp))
+
+
+# Function to lazily yield the noun and proper noun terms of each document
+def iter_noun_terms(nlp, collection, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    for doc in iter_tagged_documents(nlp, collection, batch_size=batch_size, n_process=n_process):
+        yield [token.text for token in doc if is_noun_or_proper_noun(token)]
+
+
+# Function to lazily yield the noun and proper noun terms of each document with their character offsets
+def iter_noun_terms_with_offsets(nlp, collection, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    for doc in iter_tagged_documents(nlp, collection, batch_size=batch_size, n_process=n_process):
+        nouns = [token for token in doc if is_noun_or_proper_noun(token)]
+        yield [token.text for token in nouns], [token.idx for token in nouns]
+
+
+# Function to lemmatize and POS tag each document in a single spaCy pass
+def iter_lemmatized_documents(nlp, collection, stop_words, batch_size=DEFAULT_BATCH_SIZE, n_process=1):
+    # The lemmatizer only needs the tagger, so the parser and NER can still be skipped
+    disabled = [name for name in ('parser', 'ner') if name in nlp.pipe_names]
+    for doc in nlp.pipe(collection, batch_size=batch_size, n_process=n_process, disable=disabled):
+        lemmas = []
+        noun_terms = []
+        for token in doc:
+            if token.text in stop_words or len(token.text) <= 1:
+                continue
+            lemmas.append(token.lemma_)
+            if is_noun_or_proper_noun(token):
+                noun_terms.append(token.lemma_)
+        yield lemmas, noun_terms
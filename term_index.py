@@ -0,0 +1,29 @@
+# Function to build an inverted index mapping each term to its posting list
+# of (document id, token offsets) pairs, in document order
+def build_inverted_index(documents, terms):
+    terms = set(terms)
+    inverted_index = {}
+    for doc_id, doc in enumerate(documents):
+        doc_offsets = {}
+        for offset, token in enumerate(doc.split()):
+            if token in terms:
+                doc_offsets.setdefault(token, []).append(offset)
+        for term, offsets in doc_offsets.items():
+            inverted_index.setdefault(term, []).append((doc_id, offsets))
+    return inverted_index
+
+
+# Function to get the first document containing a term and the term's token offsets in it
+def first_posting(inverted_index, term):
+    postings = inverted_index.get(term)
+    if not postings:
+        return None
+    return postings[0]
+
+
+# Function to wrap the tokens at the given offsets in highlight spans
+def highlight_tokens(doc, offsets, css_class='highlight'):
+    tokens = doc.split()
+    for offset in offsets:
+        tokens[offset] = f'<span class="{css_class}">{tokens[offset]}</span>'
+    return ' '.join(tokens)
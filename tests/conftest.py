@@ -0,0 +1,27 @@
+import os
+import random
+import sys
+import pytest
+
+# The modules live at the repository root, next to app.py
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Terms of the random corpora; few enough that documents share terms and IDF scores tie
+TERMS = [f'term{i}' for i in range(40)]
+
+
+# Fixture giving random noun term lists, including empty documents and repeated terms
+@pytest.fixture
+def noun_terms_documents():
+    rng = random.Random(7)
+    return [[rng.choice(TERMS) for _ in range(rng.choice([0, 1, 3, 8, 20]))] for _ in range(300)]
+
+
+# Fixture giving the NLTK English stop words, skipping the test when the data package is not installed
+@pytest.fixture
+def stop_words():
+    from normalizer import english_stop_words
+    try:
+        return english_stop_words()
+    except LookupError as e:
+        pytest.skip(str(e))
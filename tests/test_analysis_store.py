@@ -0,0 +1,43 @@
+import numpy as np
+from analysis_store import AnalysisStore
+from result_cache import estimate_size
+
+
+def test_add_get_and_replace():
+    store = AnalysisStore()
+    result_id = store.add({'rows': 1})
+    assert store.get(result_id) == {'rows': 1}
+    assert store.replace(result_id, {'rows': 2})
+    assert store.get(result_id) == {'rows': 2}
+    assert not store.replace('missing', {'rows': 3})
+    assert store.get('missing') is None
+
+
+def test_evicts_least_recently_used_beyond_max_entries():
+    store = AnalysisStore(max_entries=2)
+    first, second = store.add('first'), store.add('second')
+    store.get(first)
+    store.add('third')
+    assert store.get(first) == 'first' and store.get(second) is None
+
+
+def test_evicts_beyond_byte_budget_but_keeps_newest():
+    result = np.zeros(1000, dtype=np.float64)
+    store = AnalysisStore(max_bytes=2.5 * estimate_size(result))
+    ids = [store.add(result.copy()) for _ in range(3)]
+    assert store.get(ids[0]) is None
+    assert store.get(ids[1]) is not None and store.get(ids[2]) is not None
+
+    huge_id = store.add(np.zeros(10000, dtype=np.float64))
+    assert store.get(huge_id) is not None and store.get(ids[2]) is None
+
+
+def test_expires_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('analysis_store.time.monotonic', lambda: now[0])
+    store = AnalysisStore(ttl_seconds=10)
+    result_id = store.add('result')
+    now[0] += 5
+    assert store.get(result_id) == 'result'
+    now[0] += 11
+    assert store.get(result_id) is None
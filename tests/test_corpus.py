@@ -0,0 +1,81 @@
+import math
+import numpy as np
+from corpus import IncrementalCorpus, InternedCorpus, Vocabulary, pad_rows, row_sums, top_k_per_row
+
+
+# Function to score documents the way the dict-based implementation did: document frequencies counting each
+# term once per document, smoothed IDF rounded to 2 decimals, and the rounded average IDF of each document
+def dict_based_scores(noun_terms_documents):
+    document_frequencies = {}
+    for terms in noun_terms_documents:
+        for term in set(terms):
+            document_frequencies[term] = document_frequencies.get(term, 0) + 1
+    total_documents = len(noun_terms_documents)
+    idf = {term: round(math.log(total_documents / (1 + df)), 2) for term, df in document_frequencies.items()}
+    averages = [round(sum(idf[term] for term in terms) / len(terms), 2) if terms else 0
+                for terms in noun_terms_documents]
+    return document_frequencies, idf, averages
+
+
+def test_vocabulary_interns_in_order_of_first_occurrence():
+    vocabulary = Vocabulary(['b', 'a', 'b'])
+    assert vocabulary.terms == ['b', 'a']
+    assert vocabulary.intern('c') == 2
+    assert vocabulary.intern_many(['a', 'c', 'd']).tolist() == [1, 2, 3]
+    assert 'd' in vocabulary and vocabulary.get('e') is None
+
+
+def test_interned_idf_and_averages_match_dict_based(noun_terms_documents):
+    document_frequencies, idf, averages = dict_based_scores(noun_terms_documents)
+    corpus = IncrementalCorpus().add_documents(noun_terms_documents)
+    terms = corpus.vocabulary.terms
+
+    assert dict(zip(terms, corpus.document_frequencies().tolist())) == document_frequencies
+    interned_idf = corpus.inverse_document_frequencies()
+    assert dict(zip(terms, interned_idf.tolist())) == idf
+    means = corpus.document_means(interned_idf)
+    assert [round(mean, 2) for mean in means.tolist()] == averages
+
+
+def test_top_terms_rank_rarest_distinct_terms_first(noun_terms_documents):
+    _, idf, _ = dict_based_scores(noun_terms_documents)
+    corpus = InternedCorpus().add_documents(noun_terms_documents)
+    term_idf = np.array([idf[term] for term in corpus.vocabulary.terms])
+    top_offsets, top_ids = corpus.top_terms(term_idf, 10)
+
+    for row, terms in enumerate(noun_terms_documents):
+        # Distinct terms in order of first occurrence, stably sorted so ties keep that order
+        expected = sorted(dict.fromkeys(terms), key=lambda term: -idf[term])[:10]
+        got = [corpus.vocabulary.terms[term_id] for term_id in top_ids[top_offsets[row]:top_offsets[row + 1]]]
+        assert got == expected
+
+
+def test_incremental_corpus_matches_corpus_built_at_once(noun_terms_documents):
+    incremental = IncrementalCorpus()
+    for start in range(0, len(noun_terms_documents), 70):
+        incremental.add_documents(noun_terms_documents[start:start + 70])
+    at_once = IncrementalCorpus().add_documents(noun_terms_documents)
+
+    assert incremental.vocabulary.terms == at_once.vocabulary.terms
+    assert incremental.document_frequencies().tolist() == at_once.document_frequencies().tolist()
+    assert incremental.inverse_document_frequencies().tolist() == at_once.inverse_document_frequencies().tolist()
+    assert incremental.term_ids.tolist() == at_once.term_ids.tolist()
+
+
+def test_row_sums_match_python_sum():
+    rng = np.random.default_rng(3)
+    lengths = rng.integers(0, 30, size=200)
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    values = rng.random(int(offsets[-1])) * 10
+    expected = [sum(values[start:end].tolist()) for start, end in zip(offsets[:-1], offsets[1:])]
+    assert row_sums(values, offsets).tolist() == expected
+
+
+def test_rows_and_padding():
+    corpus = InternedCorpus().add_documents([['a', 'b'], [], ['c', 'a', 'c']])
+    term_ids, offsets = corpus.rows(1, 3)
+    assert term_ids.tolist() == [2, 0, 2]
+    assert offsets.tolist() == [0, 0, 3]
+
+    top_offsets, top_ids = top_k_per_row(corpus.term_ids, corpus.offsets, [1.0, 2.0, 3.0], 2)
+    assert pad_rows(top_ids, top_offsets, 2, -1).tolist() == [[1, 0], [-1, -1], [2, 0]]
@@ -0,0 +1,27 @@
+from highlighting import gradient_colors, highlight_spans, render_highlighted_text
+
+
+def test_gradient_colors_share_rank_for_equal_scores():
+    assert gradient_colors([3.0, 2.0, 2.0, 1.0]) == [
+        'rgba(255, 0, 0, 0.8)', 'rgba(255, 0, 0, 0.75)', 'rgba(255, 0, 0, 0.75)', 'rgba(255, 0, 0, 0.65)']
+
+
+def test_highlight_spans_marks_every_occurrence_of_top_terms():
+    terms = ['fever', 'cough', 'rash']
+    text = 'fever cough fever rash'
+    spans = highlight_spans([0, 1, 0, 2], [0, 6, 12, 18], [2, 0], terms)
+    assert spans == [(0, 5, 1), (12, 17, 1), (18, 22, 0)]
+    assert [text[start:end] for start, end, _ in spans] == ['fever', 'fever', 'rash']
+
+
+def test_highlight_spans_respects_budget():
+    spans = highlight_spans([0, 0, 0], [0, 6, 12], [0], ['fever'], max_spans=2)
+    assert len(spans) == 2
+    assert highlight_spans([0, 0], [0, 6], [0], ['fever'], max_chars=5) == [(0, 5, 0)]
+    assert highlight_spans([], [], [0], ['fever']) == []
+
+
+def test_render_highlighted_text_escapes_html():
+    html = render_highlighted_text('<b> rash', [(4, 8, 0)], ['red'])
+    assert html.startswith('&lt;b&gt; <span class="rare-term" data-rank="0"')
+    assert html.endswith('>rash</span>')
@@ -0,0 +1,31 @@
+import math
+import numpy as np
+from idf_engine import calculate_idf_array, calculate_idf_scores, rank_by_idf, round_scores
+
+
+def test_calculate_idf_array_matches_per_term_formula():
+    document_frequencies = [0, 1, 1, 5, 9, 3]
+    expected = [round(math.log(10 / (1 + df)), 2) for df in document_frequencies]
+    assert calculate_idf_array(document_frequencies, 10).tolist() == expected
+
+
+def test_calculate_idf_scores_matches_substring_counts():
+    documents = ['fever and cough', 'cough', 'headache after fever', 'rash']
+    terms = ['fever', 'cough', 'ache', 'missing']
+    expected = {}
+    for term in terms:
+        containing = sum(term in document for document in documents)
+        expected[term] = math.log(len(documents) / containing) if containing else 0.0
+    assert calculate_idf_scores(documents, terms) == expected
+
+
+def test_round_scores_matches_round():
+    rng = np.random.default_rng(5)
+    # Values on and next to ties, where scaling by 100 first can round the wrong way
+    scores = np.concatenate((rng.random(1000) * 5, np.arange(0, 5, 0.005), [1.005, 2.675, 0.125, 0.375]))
+    assert round_scores(scores).tolist() == [round(score, 2) for score in scores.tolist()]
+
+
+def test_rank_by_idf_keeps_ties_in_order():
+    assert rank_by_idf([0.5, 2.0, 0.5, 2.0, 1.0]).tolist() == [1, 3, 4, 0, 2]
+    assert rank_by_idf([0.5, 2.0, 1.0], max_terms=2).tolist() == [1, 2]
@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+from corpus import IncrementalCorpus, Vocabulary
+from idf_model import IDFModel
+
+
+def test_fit_matches_corpus_idf(noun_terms_documents):
+    model = IDFModel.fit([noun_terms_documents[:100], noun_terms_documents[100:]])
+    corpus = IncrementalCorpus().add_documents(noun_terms_documents)
+
+    assert model.vocabulary.terms == corpus.vocabulary.terms
+    assert model.total_documents == len(noun_terms_documents)
+    assert model.document_frequencies.tolist() == corpus.document_frequencies().tolist()
+    assert model.inverse_document_frequencies.tolist() == corpus.inverse_document_frequencies().tolist()
+
+
+def test_save_load_round_trip(tmp_path, noun_terms_documents):
+    model = IDFModel.fit([noun_terms_documents + [['fièvre', 'naïve']]])
+    path = tmp_path / 'model.idf'
+    model.save(path)
+    loaded = IDFModel.load(path)
+
+    assert loaded.vocabulary.terms == model.vocabulary.terms
+    assert loaded.total_documents == model.total_documents
+    np.testing.assert_array_equal(loaded.document_frequencies, model.document_frequencies)
+    np.testing.assert_array_equal(loaded.inverse_document_frequencies, model.inverse_document_frequencies)
+    assert loaded.unseen_idf == model.unseen_idf
+    assert loaded.fingerprint == IDFModel.load(path).fingerprint
+
+    # Saving the loaded model writes the same file, so its fingerprint is stable
+    resaved = tmp_path / 'resaved.idf'
+    loaded.save(resaved)
+    assert resaved.read_bytes() == path.read_bytes()
+
+
+def test_idf_for_aligns_with_another_vocabulary():
+    model = IDFModel.fit([[['fever', 'cough'], ['fever'], ['rash']]])
+    scores = model.idf_for(Vocabulary(['rash', 'unknown', 'fever']))
+    fever, rash = model.vocabulary.get('fever'), model.vocabulary.get('rash')
+    assert scores.tolist() == [model.inverse_document_frequencies[rash], model.unseen_idf,
+                               model.inverse_document_frequencies[fever]]
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not-a-model.idf'
+    path.write_bytes(b'\0' * 64)
+    with pytest.raises(ValueError):
+        IDFModel.load(path)
+
+
+def test_fit_without_documents_raises():
+    with pytest.raises(ValueError):
+        IDFModel.fit([])
@@ -0,0 +1,56 @@
+import time
+from analysis_store import AnalysisStore
+from jobs import DONE, FAILED, JobManager
+
+
+# Function to wait until a job has finished, failing the test rather than hanging
+def wait_for(manager, job, timeout=10):
+    for _ in range(int(timeout / 0.01)):
+        if manager.get(job.id).status in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"Job {job.id} did not finish")
+
+
+def test_submitted_job_reports_progress_and_result():
+    def analysis(rows, progress=None):
+        progress('preprocessing', len(rows))
+        return {'rows': rows}
+
+    manager = JobManager(workers=1)
+    job = wait_for(manager, manager.submit(analysis, [1, 2, 3]))
+    assert job.status == DONE
+    assert job.to_dict()['stage'] == 'preprocessing'
+    assert job.rows_processed == 3
+    assert job.result == {'rows': [1, 2, 3]}
+
+
+def test_failed_job_keeps_its_error():
+    def analysis(progress=None):
+        raise ValueError("Please provide only a one-column dataset")
+
+    manager = JobManager(workers=1)
+    job = wait_for(manager, manager.submit(analysis))
+    assert job.status == FAILED
+    assert job.error == "Please provide only a one-column dataset"
+
+
+def test_result_is_handed_off_once():
+    manager = JobManager(workers=1)
+    job = manager.add_finished({'rows': []})
+    store = AnalysisStore()
+    result_id = job.hand_off_result(store)
+    assert job.result is None
+    assert job.hand_off_result(store) == result_id
+    assert store.get(result_id) == {'rows': []}
+
+
+def test_finished_jobs_are_forgotten_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr('jobs.time.time', lambda: now[0])
+    manager = JobManager(workers=1, ttl_seconds=10)
+    job = manager.add_finished('result')
+    now[0] += 5
+    assert manager.get(job.id) is job
+    now[0] += 11
+    assert manager.get(job.id) is None
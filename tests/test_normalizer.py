@@ -0,0 +1,31 @@
+import pandas as pd
+from normalizer import normalize_documents, normalize_text, preprocess_document, preprocess_documents
+
+DOCUMENTS = [
+    'Pt seen on [**2101-3-4**] for Fever, cough & 2 days of rash.',
+    '  BP 120/80; no   acute distress ',
+    '',
+    'Follow-up in 3wks with Dr. [**Name**]',
+]
+
+
+def test_normalize_text_removes_markers_numbers_and_punctuation():
+    assert normalize_text(DOCUMENTS[0]) == 'pt seen on for fever cough days of rash'
+    assert normalize_text(DOCUMENTS[3]) == 'follow up in 3wks with dr'
+
+
+def test_normalize_documents_matches_normalize_text():
+    expected = [normalize_text(doc) for doc in DOCUMENTS]
+    assert normalize_documents(DOCUMENTS) == expected
+    assert normalize_documents(pd.Series(DOCUMENTS)) == expected
+
+
+def test_preprocess_documents_matches_preprocess_document():
+    stop_words = frozenset(['on', 'for', 'of', 'in', 'with', 'no'])
+    expected = [preprocess_document(doc, stop_words) for doc in DOCUMENTS]
+    assert preprocess_documents(DOCUMENTS, stop_words) == expected
+    assert expected[0] == 'pt seen fever cough days rash'
+
+
+def test_preprocess_drops_english_stop_words(stop_words):
+    assert preprocess_documents(['The fever and the cough'])[0] == 'fever cough'
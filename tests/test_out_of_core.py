@@ -0,0 +1,34 @@
+import csv
+import json
+from corpus import IncrementalCorpus
+from out_of_core import score_out_of_core
+from outlier_doc import score_documents
+from rarity_stats import RarityStatistics
+
+
+def test_out_of_core_scores_match_in_memory_scores(tmp_path, noun_terms_documents):
+    output_path = tmp_path / 'scores.jsonl'
+    statistics = RarityStatistics()
+    total = score_out_of_core(iter(noun_terms_documents), str(output_path), spill_dir=str(tmp_path / 'spill'),
+                              block_size=64, statistics=statistics)
+
+    corpus = IncrementalCorpus().add_documents(noun_terms_documents)
+    rarity_scores, top_term_ids, _ = score_documents(corpus, corpus.inverse_document_frequencies())
+    rows = [json.loads(line) for line in output_path.read_text(encoding='utf-8').splitlines()]
+
+    assert total == len(rows) == len(noun_terms_documents)
+    assert [row['Index'] for row in rows] == list(range(1, total + 1))
+    assert [row['Rarity Score'] for row in rows] == rarity_scores.astype(float).round(2).tolist()
+    for row, term_ids in zip(rows, top_term_ids.tolist()):
+        assert row['Rarest Terms'] == [corpus.vocabulary.terms[term_id] for term_id in term_ids if term_id >= 0]
+    assert statistics.count == total
+
+
+def test_out_of_core_writes_csv(tmp_path):
+    output_path = tmp_path / 'scores.csv'
+    score_out_of_core(iter([['fever', 'cough'], [], ['fever']]), str(output_path))
+    with open(output_path, newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert [row['Index'] for row in rows] == ['1', '2', '3']
+    assert rows[0]['Rarest Terms'] == 'cough, fever'
+    assert rows[1]['Rarity Score'] == '0.00'
@@ -0,0 +1,47 @@
+import array
+import numpy as np
+from corpus import IncrementalCorpus
+from outlier_doc import append_documents, copy_for_append, refresh_scores
+
+
+# Function to build an analysis of preprocessed and tagged documents in the given batches, rescoring after each
+def analyze_in_batches(noun_terms_documents, batch_size):
+    result = {
+        'original_documents': [],
+        'preprocessed_documents': [],
+        'corpus': IncrementalCorpus(),
+        'term_char_offsets': array.array('i'),
+        'score_only': False,
+    }
+    for start in range(0, len(noun_terms_documents), batch_size):
+        batch = noun_terms_documents[start:start + batch_size]
+        texts = [' '.join(terms) for terms in batch]
+        term_offsets = [[len(' '.join(terms[:i])) + (i > 0) for i in range(len(terms))] for terms in batch]
+        append_documents(result, texts, texts, batch, term_offsets)
+        refresh_scores(result)
+    return result
+
+
+def test_append_then_rescore_matches_full_analysis(noun_terms_documents):
+    appended = analyze_in_batches(noun_terms_documents, 120)
+    full = analyze_in_batches(noun_terms_documents, len(noun_terms_documents))
+
+    assert appended['scored_documents'] == len(noun_terms_documents)
+    for key in ('rarity_scores', 'top_term_ids', 'top_term_scores', 'rarity_order'):
+        np.testing.assert_array_equal(appended[key], full[key])
+    assert appended['histogram'] == full['histogram']
+    assert appended['statistics'].summary() == full['statistics'].summary()
+    assert appended['term_char_offsets'] == full['term_char_offsets']
+
+
+def test_copy_for_append_leaves_the_original_untouched(noun_terms_documents):
+    original = analyze_in_batches(noun_terms_documents[:100], 100)
+    scores = original['rarity_scores'].copy()
+
+    copied = copy_for_append(original)
+    append_documents(copied, ['late'], ['late'], [['term1']], [[0]])
+    refresh_scores(copied)
+
+    assert len(original['corpus']) == 100 and len(copied['corpus']) == 101
+    np.testing.assert_array_equal(original['rarity_scores'], scores)
+    assert len(original['original_documents']) == 100
@@ -0,0 +1,27 @@
+import pytest
+from preprocessing import get_nlp, lemmatize_chunk, parallel_lemmatize_documents, parallel_preprocess_documents, \
+    preprocess_chunk
+
+DOCUMENTS = [f'Patient {i} reports fever, cough and the {"severe " * (i % 3)}headaches since [**2101-3-4**].'
+             for i in range(60)]
+
+
+# Fixture giving the spaCy language model, skipping the test when it is not installed
+@pytest.fixture
+def nlp(stop_words):
+    try:
+        return get_nlp()
+    except OSError as e:
+        pytest.skip(str(e))
+
+
+def test_parallel_preprocessing_matches_serial(stop_words):
+    expected = preprocess_chunk(DOCUMENTS)
+    assert parallel_preprocess_documents(DOCUMENTS, workers=2, chunk_size=7) == expected
+    assert parallel_preprocess_documents(DOCUMENTS, workers=1) == expected
+
+
+def test_parallel_lemmatizing_matches_serial(nlp):
+    expected = lemmatize_chunk(DOCUMENTS)
+    assert parallel_lemmatize_documents(DOCUMENTS, workers=2, chunk_size=7) == expected
+    assert parallel_lemmatize_documents(DOCUMENTS, workers=2, chunk_size=7, batch_size=5) == expected
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+from rarity_stats import P2Quantile, RarityStatistics
+
+
+def test_statistics_match_numpy_across_chunks():
+    scores = np.round(np.random.default_rng(11).gamma(4.0, 0.5, size=5000), 2)
+    statistics = RarityStatistics()
+    for start in range(0, len(scores), 700):
+        statistics.update(scores[start:start + 700])
+
+    assert statistics.count == len(scores)
+    assert statistics.mean == pytest.approx(scores.mean())
+    assert statistics.variance == pytest.approx(scores.var())
+    assert statistics.std == pytest.approx(scores.std())
+    assert statistics.median == pytest.approx(np.median(scores), abs=0.05)
+    assert statistics.summary()['min'] == scores.min() and statistics.summary()['max'] == scores.max()
+
+
+def test_histogram_counts_every_score_in_its_bin():
+    scores = [0.0, 0.04, 0.05, 0.7, 0.71, 1.23]
+    counts, edges = RarityStatistics(bin_width=0.05).update(scores).histogram()
+    assert sum(counts) == len(scores)
+    assert len(edges) == len(counts) + 1
+    for score in scores:
+        position = int(np.searchsorted(edges, score, side='right')) - 1
+        assert counts[position] > 0
+    assert counts[edges.index(0.7)] == 2
+
+
+def test_histogram_merges_bins_beyond_max_bins():
+    statistics = RarityStatistics(bin_width=0.05).update(np.arange(0, 10, 0.05))
+    counts, edges = statistics.histogram(max_bins=20)
+    assert len(counts) <= 20 and sum(counts) == statistics.count
+
+
+def test_empty_statistics():
+    statistics = RarityStatistics().update([])
+    assert statistics.histogram() == ([], [])
+    assert statistics.summary()['count'] == 0
+
+
+def test_p2_quantile_is_exact_for_few_values():
+    quantile = P2Quantile(0.5)
+    for value in [5.0, 1.0, 3.0]:
+        quantile.add(value)
+    assert quantile.value() == 3.0
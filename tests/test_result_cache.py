@@ -0,0 +1,52 @@
+import os
+import numpy as np
+from result_cache import ResultCache, content_cache_key, estimate_size
+
+
+def test_content_cache_key_depends_on_content_and_options():
+    key = content_cache_key('abc', analysis='doc', version=1)
+    assert key == content_cache_key('abc', version=1, analysis='doc')
+    assert key != content_cache_key('abd', analysis='doc', version=1)
+    assert key != content_cache_key('abc', analysis='doc', version=2)
+
+
+def test_estimate_size_counts_array_buffers():
+    scores = np.zeros(100000, dtype=np.float64)
+    assert estimate_size({'scores': scores}) >= scores.nbytes
+    assert estimate_size(list(range(10000))) > estimate_size(list(range(100)))
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+    cache.get('a')
+    cache.put('c', 3)
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+
+
+def test_memory_tier_is_bounded_by_size():
+    value = np.zeros(1000, dtype=np.float64)
+    cache = ResultCache(max_entries=10, max_bytes=2.5 * estimate_size(value))
+    for key in 'abc':
+        cache.put(key, value.copy())
+    assert cache.get('a') is None and cache.get('c') is not None
+
+    cache.put('huge', np.zeros(10000, dtype=np.float64))
+    assert cache.get('huge') is None
+
+
+def test_disk_tier_survives_a_restart_and_is_bounded(tmp_path):
+    cache = ResultCache(max_entries=2, disk_dir=str(tmp_path))
+    cache.put('a', {'rows': [1, 2]})
+    cache.put('b', {'rows': [3]})
+    cache.clear()
+    assert cache.get('a') == {'rows': [1, 2]}
+
+    # 'a' was just used, so 'b' is the least recently used file and is removed first
+    cache.put('c', {'rows': []})
+    assert sorted(os.listdir(tmp_path)) == ['a.pkl', 'c.pkl']
+
+    restarted = ResultCache(max_entries=1, disk_dir=str(tmp_path))
+    assert os.listdir(tmp_path) == ['c.pkl']
+    assert restarted.get('c') == {'rows': []}
@@ -0,0 +1,53 @@
+import csv
+import json
+import pytest
+from score_writers import DOCUMENT_SCORE_COLUMNS, format_csv_value, open_score_writer, output_format_for
+
+BLOCKS = [
+    {'Index': [1, 2], 'Rarity Score': [1.5, 0.0], 'Rarest Terms': [['fever', 'cough'], []],
+     'Term Rarity Score': [[2.25, 0.75], []]},
+    {'Index': [3], 'Rarity Score': [3.14159], 'Rarest Terms': [['rash']], 'Term Rarity Score': [[3.14159]]},
+]
+
+
+# Function to write the score blocks to a file and return its path
+def write_blocks(tmp_path, name):
+    path = str(tmp_path / name)
+    writer = open_score_writer(path, DOCUMENT_SCORE_COLUMNS)
+    for block in BLOCKS:
+        writer.write(block)
+    writer.close()
+    return path
+
+
+# Function to join the score blocks into the rows they describe
+def expected_rows():
+    return [dict(zip(BLOCKS[0], values)) for block in BLOCKS for values in zip(*block.values())]
+
+
+def test_output_format_for():
+    assert output_format_for('scores.NDJSON') == 'jsonl'
+    assert output_format_for('scores.txt', 'csv') == 'csv'
+    with pytest.raises(ValueError):
+        output_format_for('scores.txt')
+
+
+def test_csv_round_trip(tmp_path):
+    with open(write_blocks(tmp_path, 'scores.csv'), newline='', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [{column: str(format_csv_value(value)) for column, value in row.items()}
+                    for row in expected_rows()]
+    assert rows[2]['Rarity Score'] == '3.14'
+
+
+def test_jsonl_round_trip(tmp_path):
+    with open(write_blocks(tmp_path, 'scores.jsonl'), encoding='utf-8') as f:
+        assert [json.loads(line) for line in f] == expected_rows()
+
+
+def test_parquet_and_arrow_round_trip(tmp_path):
+    pytest.importorskip('pyarrow')
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+    assert pq.read_table(write_blocks(tmp_path, 'scores.parquet')).to_pylist() == expected_rows()
+    assert feather.read_table(write_blocks(tmp_path, 'scores.arrow')).to_pylist() == expected_rows()
@@ -0,0 +1,4 @@
+from server import create_app
+
+# WSGI entry point for production servers, e.g. `gunicorn wsgi:app` (see run.sh)
+app = create_app(preload_models=True)